@@ -0,0 +1,227 @@
+import json
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import pandas as pd
+
+from fileutil import atomic_write, file_lock
+from menu import line_item_id
+from order_status import CANCELLED
+
+UNKNOWN_CATEGORY = "Other"
+# Bump when the stored layout changes, older files are rebuilt from the orders
+STATS_VERSION = 3
+
+# Returns every stored order and a map from item id to category
+History = Callable[[], Tuple[Iterable[Mapping[str, Any]], Mapping[str, str]]]
+
+
+class OrderStats:
+    """Running sales totals, small enough to load on every dashboard render
+
+    Cancelled orders are not sales and are left out.
+    """
+
+    def __init__(self) -> None:
+        self.orders = 0
+        self.revenue = 0.0
+        self.items = 0
+        self.by_day: Dict[str, List[float]] = {}       # day -> [orders, revenue]
+        self.by_category: Dict[str, float] = {}        # category -> revenue
+        self.by_item: Dict[str, List[float]] = {}      # item id -> [quantity, revenue]
+        self.by_hour: List[int] = [0] * 24             # hour of day -> orders
+
+    def add_order(self, order: Mapping[str, Any], categories: Mapping[str, str]) -> None:
+        """Fold one order into the totals, ``categories`` maps item ids to categories"""
+        if order['status'] != CANCELLED:
+            self._apply(order, categories, 1)
+
+    def remove_order(self, order: Mapping[str, Any], categories: Mapping[str, str]) -> None:
+        """Take an order added earlier back out of the totals, when it is cancelled"""
+        self._apply(order, categories, -1)
+
+    def _apply(self, order: Mapping[str, Any], categories: Mapping[str, str], sign: int) -> None:
+        day = order['timestamp'][:10]
+        hour = int(order['timestamp'][11:13])
+
+        self.orders += sign
+        self.revenue += sign * order['total']
+        day_totals = self.by_day.setdefault(day, [0, 0.0])
+        day_totals[0] += sign
+        day_totals[1] += sign * order['total']
+        self.by_hour[hour] += sign
+
+        for item in order['items']:
+            item_id = line_item_id(item)
+            quantity = sign * item['quantity']
+            amount = quantity * item['price']
+            self.items += quantity
+            category = categories.get(item_id, UNKNOWN_CATEGORY)
+            self.by_category[category] = self.by_category.get(category, 0.0) + amount
+            item_totals = self.by_item.setdefault(item_id, [0, 0.0])
+            item_totals[0] += quantity
+            item_totals[1] += amount
+
+    @property
+    def average_basket(self) -> float:
+        return self.revenue / self.orders if self.orders else 0.0
+
+    @property
+    def average_items(self) -> float:
+        return self.items / self.orders if self.orders else 0.0
+
+    def top_items(self, count: int = 10) -> List[Tuple[str, int, float]]:
+        ranked = sorted(self.by_item.items(), key=lambda entry: entry[1][0], reverse=True)
+        return [(item_id, int(quantity), revenue) for item_id, (quantity, revenue) in ranked[:count]]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': STATS_VERSION,
+            'orders': self.orders,
+            'revenue': self.revenue,
+            'items': self.items,
+            'by_day': self.by_day,
+            'by_category': self.by_category,
+            'by_item': self.by_item,
+            'by_hour': self.by_hour,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> 'OrderStats':
+        stats = cls()
+        stats.orders = data['orders']
+        stats.revenue = data['revenue']
+        stats.items = data['items']
+        stats.by_day = data['by_day']
+        stats.by_category = data['by_category']
+        stats.by_item = data['by_item']
+        stats.by_hour = data['by_hour']
+        return stats
+
+    @classmethod
+    def from_orders(cls, orders: Iterable[Mapping[str, Any]], categories: Mapping[str, str]) -> 'OrderStats':
+        """Recompute everything from scratch in one vectorized pass"""
+        order_rows = []
+        item_rows = []
+        for order in orders:
+            if order['status'] == CANCELLED:
+                continue
+            order_rows.append((order['timestamp'], order['total']))
+            for item in order['items']:
+                item_rows.append((line_item_id(item), item['quantity'], item['price']))
+
+        stats = cls()
+        if not order_rows:
+            return stats
+
+        order_frame = pd.DataFrame(order_rows, columns=['timestamp', 'total'])
+        order_frame['day'] = order_frame['timestamp'].str.slice(0, 10)
+        order_frame['hour'] = order_frame['timestamp'].str.slice(11, 13).astype(int)
+        stats.orders = len(order_frame)
+        stats.revenue = float(order_frame['total'].sum())
+        by_day = order_frame.groupby('day')['total'].agg(['count', 'sum'])
+        stats.by_day = {day: [int(row['count']), float(row['sum'])] for day, row in by_day.iterrows()}
+        by_hour = order_frame['hour'].value_counts()
+        stats.by_hour = [int(by_hour.get(hour, 0)) for hour in range(24)]
+
+        if item_rows:
+            item_frame = pd.DataFrame(item_rows, columns=['item_id', 'quantity', 'price'])
+            item_frame['amount'] = item_frame['quantity'] * item_frame['price']
+            item_frame['category'] = item_frame['item_id'].map(categories).fillna(UNKNOWN_CATEGORY)
+            stats.items = int(item_frame['quantity'].sum())
+            stats.by_category = {
+                category: float(amount)
+                for category, amount in item_frame.groupby('category')['amount'].sum().items()
+            }
+            by_item = item_frame.groupby('item_id')[['quantity', 'amount']].sum()
+            stats.by_item = {
+                item_id: [int(row['quantity']), float(row['amount'])] for item_id, row in by_item.iterrows()
+            }
+        return stats
+
+
+class StatsStore:
+    """Keeps OrderStats in a small JSON file next to the other data files
+
+    ``history`` returns every stored order and the item categories. When the
+    file is missing, unreadable or in an older layout the totals are rebuilt
+    from it instead of failing, without it they start from zero.
+    """
+
+    def __init__(self, path: str = 'data/analytics.json', history: Optional[History] = None) -> None:
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.history = history
+
+    def is_current(self) -> bool:
+        """False when the totals are missing, unreadable or stored in an older layout"""
+        return self._read() is not None
+
+    def load(self) -> OrderStats:
+        """The stored totals, rebuilt first if the file is stale"""
+        stats = self._read()
+        if stats is None:
+            with file_lock(self.lock_path):
+                stats = self._read()
+                if stats is None:
+                    stats = self._rebuild()
+        return stats
+
+    def record(self, order: Mapping[str, Any], categories: Mapping[str, str]) -> None:
+        """Add one order to the stored totals, cost does not depend on history size"""
+        self.record_many([order], categories)
+
+    def record_many(self, orders: Iterable[Mapping[str, Any]], categories: Mapping[str, str]) -> None:
+        """Add a batch of orders to the stored totals with a single write"""
+        with file_lock(self.lock_path):
+            stats = self._read()
+            if stats is None:
+                # Orders are recorded after they are stored, the rebuild has them
+                self._rebuild()
+                return
+            for order in orders:
+                stats.add_order(order, categories)
+            self._write(stats)
+
+    def remove(self, order: Mapping[str, Any], categories: Mapping[str, str]) -> None:
+        """Subtract a cancelled order from the stored totals"""
+        with file_lock(self.lock_path):
+            stats = self._read()
+            if stats is None:
+                self._rebuild()
+                return
+            stats.remove_order(order, categories)
+            self._write(stats)
+
+    def rebuild(self, orders: Iterable[Mapping[str, Any]], categories: Mapping[str, str]) -> OrderStats:
+        """Replace the stored totals with ones recomputed from the full history"""
+        with file_lock(self.lock_path):
+            stats = OrderStats.from_orders(orders, categories)
+            self._write(stats)
+        return stats
+
+    def _read(self) -> Optional[OrderStats]:
+        # None when the file is missing, unreadable or in an older layout
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return None
+        except ValueError:
+            return None  # Corrupt or truncated, e.g. written by an older version without fsync
+        if not isinstance(data, dict) or data.get('version') != STATS_VERSION:
+            return None
+        try:
+            return OrderStats.from_dict(data)
+        except KeyError:
+            return None
+
+    def _rebuild(self) -> OrderStats:
+        if self.history is None:
+            stats = OrderStats()
+        else:
+            stats = OrderStats.from_orders(*self.history())
+        self._write(stats)
+        return stats
+
+    def _write(self, stats: OrderStats) -> None:
+        atomic_write(self.path, json.dumps(stats.to_dict()))
@@ -1,17 +1,64 @@
 import streamlit as st
-from datetime import datetime
-import hashlib
+from datetime import date, datetime, timedelta
+import io
 import json
 import os
-from typing import Dict, List, Any, Union
-from PIL import Image
-
-home_image = Image.open('images/TOO_restaurant_Panoramique_vue_Paris_nuit_v2-scaled.png')
-about_us_image = Image.open('images/26258537.jpg')
-
-
+from typing import Dict, List, Any, Mapping, Optional, Sequence, Tuple, Union, cast
+import pandas as pd
+
+import metrics
+from analytics import StatsStore
+from assets import asset_path
+from auth import LoginThrottle, hash_password, needs_rehash, verify_password
+from change_feed import ChangeFeed
+from menu import CATEGORIES, MenuIndex, line_item_id
+from menu_io import MenuImportError, export_menu_text, format_for, import_menu
+from messages import MessageStore
+from order_queue import OrderQueue
+from order_status import (CANCELLED, DELIVERED, OPEN_STATUSES, ORDER_STATUSES, OUT_FOR_DELIVERY,
+                          PENDING, PREPARING, TRANSITIONS, InvalidTransition, OrderBoard)
+from storage import Menu, Storage, open_storage
+
+HOME_IMAGE = 'images/TOO_restaurant_Panoramique_vue_Paris_nuit_v2-scaled.png'
+ABOUT_US_IMAGE = 'images/26258537.jpg'
+ORDERS_PAGE_SIZE = 20
+ORDERS_DEFAULT_DAYS = 7  # The order list opens on the last week, not the whole history
+MESSAGES_PAGE_SIZE = 20
+KITCHEN_REFRESH_SECONDS = 3
+TRANSITION_LABELS = {
+    PREPARING: "Start preparing",
+    OUT_FOR_DELIVERY: "Send out",
+    DELIVERED: "Delivered",
+    CANCELLED: "Cancel",
+}
+
+
+@st.cache_resource
+def get_storage() -> Storage:
+    """One storage backend per server process, shared by every session
+
+    Set RESTAURANT_STORAGE=sqlite to use data/restaurant.db instead of the
+    JSON files, existing data/*.json is migrated into it the first time.
+    """
+    storage = open_storage(os.environ.get('RESTAURANT_STORAGE', 'json'))
+    if metrics.ENABLED:
+        return cast(Storage, metrics.InstrumentedStorage(storage))
+    return storage
+
+
+@st.cache_resource
+def get_stats_store() -> StatsStore:
+    """Sales totals shared by every session, built from the history once"""
+    storage = get_storage()
+    store = StatsStore(history=lambda: (storage.get_orders(), storage.menu_index().categories_by_id()))
+    # Rebuilds a missing or stale file now rather than on the first dashboard render
+    store.load()
+    return store
+
+
+@st.cache_resource
 def load_data() -> None:
-    """Initialize data directories and files if they don't exist"""
+    """Initialize data directories and files if they don't exist, once per process"""
     if not os.path.exists('data'):
         os.makedirs('data')
 
@@ -31,69 +78,209 @@ def load_data() -> None:
                 st.error(f"Error creating {file_path}: {str(e)}")
 
 
-def save_menu(menu_items: List[Dict[str, Any]]) -> None:
-    """Save menu items to JSON file"""
+def save_menu(menu_items: Sequence[Mapping[str, Any]]) -> None:
+    """Save menu items to storage"""
     try:
-        with open('data/menu.json', 'w', encoding='utf-8') as f:
-            json.dump(menu_items, f, indent=2)
+        get_storage().save_menu(menu_items)
     except IOError as e:
         st.error(f"Error saving menu: {str(e)}")
 
 
-def load_menu() -> List[Dict[str, Any]]:
-    """Load menu items from JSON file"""
+def import_uploaded_menu(filename: str, data: bytes, replace: bool) -> None:
+    """Validate an uploaded CSV or JSON menu and save it in one write"""
     try:
-        with open('data/menu.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with io.StringIO(data.decode('utf-8-sig'), newline='') as stream:
+            result = import_menu(get_storage(), stream, format_for(filename), replace)
+    except MenuImportError as e:
+        st.error("Nothing was imported:\n\n" + "\n".join(f"- {error}" for error in e.errors))
+    except ValueError as e:
+        st.error(f"Could not read {filename}: {str(e)}")
+    except IOError as e:
+        st.error(f"Error saving menu: {str(e)}")
+    else:
+        st.success(f"Menu imported: {result.created} added, {result.updated} updated, {result.removed} removed")
+
+
+def load_menu() -> Menu:
+    """Load the shared, read-only menu (cached until the menu changes)"""
+    try:
+        return get_storage().load_menu()
     except IOError as e:
         st.error(f"Error loading menu: {str(e)}")
-        return []
+        return ()
+
+
+@st.cache_resource
+def get_order_queue() -> OrderQueue:
+    """Order submission queue and its worker thread, outlives reruns and sessions"""
+    storage = get_storage()
+    # Build the stats store first, so a first-time rebuild cannot count queued orders twice
+    stats_store = get_stats_store()
+
+    def record_stats(orders: List[Dict[str, Any]]) -> None:
+        stats_store.record_many(orders, storage.menu_index().categories_by_id())
+
+    return OrderQueue(storage, on_persisted=record_stats)
+
 
+@st.cache_resource
+def get_order_board() -> OrderBoard:
+    """Open orders by status, shared by every session's kitchen display"""
+    storage = get_storage()
+    # Start the queue first, so orders recovered from a dead process's spool are included
+    get_order_queue()
+    board = OrderBoard()
+    board.load(open_orders(storage))
+    return board
 
-def save_order(order: Dict[str, Any]) -> None:
-    """Save order to JSON file"""
+
+def open_orders(storage: Storage) -> List[Dict[str, Any]]:
+    return [order for status in OPEN_STATUSES for order in storage.query_orders(status=status)]
+
+
+@st.cache_resource
+def get_change_feed() -> ChangeFeed:
+    """Watches data/ for changes made by other server processes
+
+    Menu and user caches follow the feed's versions, and the order board is
+    reloaded when another process adds or moves an order. Changes this
+    process made are already on the board and do not reload it.
+    """
+    storage = get_storage()
+    queue = get_order_queue()
+    board = get_order_board()
+    feed = ChangeFeed(storage)
+    synced = {'orders': feed.versions['orders']}
+
+    def reload_board() -> bool:
+        if queue.stats()['queue_depth']:
+            return False  # Our own orders are still on their way to storage, try again later
+        version = feed.versions['orders']
+        if storage.changed_elsewhere(synced['orders'], version):
+            board.replace(open_orders(storage))
+        synced['orders'] = version
+        return True
+
+    feed.subscribe('orders', reload_board)
+    feed.start()
+    return feed
+
+
+def get_menu_index() -> MenuIndex:
+    """Index of the cached menu by item id and category"""
     try:
-        orders = get_orders()
-        orders.append(order)
-        with open('data/orders.json', 'w', encoding='utf-8') as f:
-            json.dump(orders, f, indent=2)
+        return get_storage().menu_index()
+    except IOError as e:
+        st.error(f"Error loading menu: {str(e)}")
+        return MenuIndex(())
+
+
+def save_order(order: Dict[str, Any]) -> Optional[str]:
+    """Queue order for the background worker, returns the order id once it is durable"""
+    try:
+        board = get_order_board()
+        order_id = get_order_queue().submit(order)
     except IOError as e:
         st.error(f"Error saving order: {str(e)}")
+        return None
+    board.add(order)
+    return order_id
+
+
+def change_order_status(order_id: str, status: str) -> None:
+    """Move an order along the workflow, the change is saved by the order queue"""
+    try:
+        board = get_order_board()
+        order = board.get(order_id)
+        board.transition(order_id, status)
+        get_order_queue().update_status(order_id, status)
+    except InvalidTransition as e:
+        st.warning(str(e))
+        return
+    except IOError as e:
+        st.error(f"Error updating order: {str(e)}")
+        return
+    if status == CANCELLED and order is not None:
+        # Cancelled orders do not count as sales
+        try:
+            get_stats_store().remove(order, get_menu_index().categories_by_id())
+        except IOError as e:
+            st.error(f"Error updating analytics: {str(e)}")
 
 
 def get_orders() -> List[Dict[str, Any]]:
-    """Get all orders from JSON file"""
+    """Get all orders from storage"""
     try:
-        with open('data/orders.json', 'r', encoding='utf-8') as f:
-            return json.load(f)
+        return get_storage().get_orders()
     except IOError as e:
         st.error(f"Error loading orders: {str(e)}")
         return []
 
 
-def save_user(username: str, password: str) -> None:
-    """Save user credentials to JSON file"""
+def query_orders(limit: int, offset: int = 0, **filters: Optional[str]) -> List[Dict[str, Any]]:
+    """Get one page of orders matching the filters, newest first"""
     try:
-        with open('data/users.json', 'r', encoding='utf-8') as f:
-            users = json.load(f)
+        return get_storage().query_orders(limit=limit, offset=offset, **filters)
+    except IOError as e:
+        st.error(f"Error loading orders: {str(e)}")
+        return []
 
-        users[username] = hashlib.sha256(password.encode()).hexdigest()
 
-        with open('data/users.json', 'w', encoding='utf-8') as f:
-            json.dump(users, f, indent=2)
+def query_page(limit: int, offset: int = 0, **filters: Optional[str]) -> Tuple[List[Dict[str, Any]], int]:
+    """One page of orders matching the filters and how many match in total"""
+    try:
+        return get_storage().query_page(limit, offset, **filters)
+    except IOError as e:
+        st.error(f"Error loading orders: {str(e)}")
+        return [], 0
+
+
+@st.cache_resource
+def get_message_store() -> MessageStore:
+    """Contact messages and their flush thread, shared by every session"""
+    return MessageStore()
+
+
+def save_message(name: str, email: str, message: str) -> bool:
+    """Queue a contact message, it reaches disk with the next batch"""
+    try:
+        get_message_store().submit(name, email, message)
+        return True
+    except IOError as e:
+        st.error(f"Error saving message: {str(e)}")
+        return False
+
+
+def mark_messages_read(message_ids: List[str]) -> None:
+    try:
+        get_message_store().mark_read(message_ids)
+    except IOError as e:
+        st.error(f"Error updating messages: {str(e)}")
+
+
+@st.cache_resource
+def get_login_throttle() -> LoginThrottle:
+    """Failed-login counters shared by every session"""
+    return LoginThrottle()
+
+
+def save_user(username: str, password: str) -> None:
+    """Save user credentials to storage"""
+    try:
+        get_storage().set_user_hash(username, hash_password(password))
     except IOError as e:
         st.error(f"Error saving user: {str(e)}")
 
 
 def verify_user(username: str, password: str) -> bool:
-    """Verify user credentials"""
+    """Verify user credentials, upgrading old password hashes on success"""
     try:
-        with open('data/users.json', 'r', encoding='utf-8') as f:
-            users = json.load(f)
-
-        if username in users:
-            return users[username] == hashlib.sha256(password.encode()).hexdigest()
-        return False
+        stored_hash = get_storage().get_user_hash(username)
+        if not verify_password(password, stored_hash):
+            return False
+        if needs_rehash(stored_hash):
+            get_storage().set_user_hash(username, hash_password(password))
+        return True
     except IOError as e:
         st.error(f"Error verifying user: {str(e)}")
         return False
@@ -102,7 +289,7 @@ def verify_user(username: str, password: str) -> bool:
 # --- Page Functions ---
 def home_page() -> None:
     st.title("Welcome to Our Restaurant 🍽️")
-    st.image(home_image, caption="Restaurant Ambiance")
+    st.image(asset_path(HOME_IMAGE, 1600), caption="Restaurant Ambiance")
     st.write("""
     Welcome to our restaurant! We offer a wide variety of delicious dishes 
     prepared by our expert chefs. Enjoy our comfortable ambiance and 
@@ -117,42 +304,84 @@ def home_page() -> None:
             st.write(item['description'])
 
 
-def delivery_page() -> None:
-    st.title("Order Delivery 🚚")
-
-    menu = load_menu()
-    if not menu:
-        st.warning("No items available in the menu")
-        return
-
-    order_items: List[Dict[str, Union[str, int, float]]] = []
-    for item in menu:
-        col1, col2, col3 = st.columns([2, 1, 1])
+def update_cart(item_id: str) -> None:
+    """Copy a quantity widget into the cart, which outlives the widget"""
+    quantity = st.session_state[f"qty_{item_id}"]
+    if quantity > 0:
+        st.session_state['cart'][item_id] = quantity
+    else:
+        st.session_state['cart'].pop(item_id, None)
+
+
+def cart_items(index: MenuIndex, cart: Mapping[str, int]) -> List[Dict[str, Union[str, int, float]]]:
+    """Order lines for the items in the cart that are still on the menu"""
+    return [
+        {
+            'item_id': item_id,
+            'quantity': quantity,
+            'price': index.by_id[item_id]['price']
+        }
+        for item_id, quantity in cart.items() if item_id in index.by_id
+    ]
+
+
+@st.fragment
+def menu_browser(index: MenuIndex) -> None:
+    """Category picker, quantities and the order summary
+
+    Every quantity change goes straight into the cart, so switching category
+    never drops an edit. Edits and category switches only re-run this
+    fragment, the order summary is part of it. The page re-runs only when
+    the checkout form has to appear or disappear.
+    """
+    cart: Dict[str, int] = st.session_state['cart']
+    category = st.radio("Category", index.categories, horizontal=True)
+    for item in index.by_category[category]:
+        col1, col2 = st.columns([3, 1])
         with col1:
             st.write(f"**{item['name']}** - ${item['price']}")
             st.write(item['description'])
         with col2:
-            quantity = st.number_input(
+            st.number_input(
                 f"Quantity for {item['name']}",
                 min_value=0,
                 max_value=10,
-                value=0,
-                key=f"qty_{item['name']}"
+                value=cart.get(item['id'], 0),
+                key=f"qty_{item['id']}",
+                on_change=update_cart,
+                args=(item['id'],)
             )
-        st.text("")
-        st.text("")
-        if quantity > 0:
-            order_items.append({
-                'name': item['name'],
-                'quantity': quantity,
-                'price': item['price']
-            })
 
+    order_items = cart_items(index, cart)
+    if bool(order_items) != st.session_state.get('checkout_shown', False):
+        st.rerun()
     if order_items:
         st.subheader("Your Order")
-        total = sum(item['quantity'] * item['price'] for item in order_items)
-        st.write(f"Total: ${total:.2f}")
+        for item in order_items:
+            st.write(f"- {index.name_for(item['item_id'])} x{item['quantity']}")
+        st.write(f"Total: ${sum(item['quantity'] * item['price'] for item in order_items):.2f}")
+
+
+def delivery_page() -> None:
+    st.title("Order Delivery 🚚")
 
+    placed_order_id = st.session_state.pop('placed_order_id', None)
+    if placed_order_id is not None:
+        st.success(f"Order placed successfully! Your order number is {placed_order_id}.")
+
+    index = get_menu_index()
+    if not index.by_id:
+        st.warning("No items available in the menu")
+        return
+
+    # Quantities live in the cart, so only the open category needs widgets
+    cart: Dict[str, int] = st.session_state.setdefault('cart', {})
+    order_items = cart_items(index, cart)
+    st.session_state['checkout_shown'] = bool(order_items)
+    menu_browser(index)
+
+    if order_items:
+        total = sum(item['quantity'] * item['price'] for item in order_items)
         with st.form("delivery_form"):
             name = st.text_input("Name")
             address = st.text_input("Delivery Address")
@@ -167,17 +396,23 @@ def delivery_page() -> None:
                         'items': order_items,
                         'total': total,
                         'timestamp': datetime.now().isoformat(),
-                        'status': 'pending'
+                        'status': PENDING
                     }
-                    save_order(order)
-                    st.success("Order placed successfully!")
+                    order_id = save_order(order)
+                    if order_id is not None:
+                        for item_id in cart:
+                            st.session_state.pop(f"qty_{item_id}", None)
+                        st.session_state['cart'] = {}
+                        # Re-run so the quantity inputs show the emptied cart
+                        st.session_state['placed_order_id'] = order_id
+                        st.rerun()
                 else:
                     st.error("Please fill in all fields")
 
 
 def about_us_page() -> None:
     st.title("About Us 📖")
-    st.image(about_us_image)
+    st.image(asset_path(ABOUT_US_IMAGE, 960))
     st.write("""
     ### Our Story
 
@@ -229,7 +464,8 @@ def contact_us_page() -> None:
 
         if st.form_submit_button("Send Message"):
             if name and email and message:
-                st.success("Message sent! We'll get back to you soon.")
+                if save_message(name, email, message):
+                    st.success("Message sent! We'll get back to you soon.")
             else:
                 st.error("Please fill in all fields")
 
@@ -259,13 +495,179 @@ def admin_login() -> None:
         submitted = st.form_submit_button("Login")
 
         if submitted:
-            if verify_user(username, password):
+            throttle = get_login_throttle()
+            wait = throttle.retry_after(username)
+            if wait > 0:
+                st.error(f"Too many failed attempts. Try again in {wait:.0f} seconds.")
+                return
+            if not throttle.acquire():
+                st.error("The server is busy, please try again.")
+                return
+            try:
+                verified = verify_user(username, password)
+            finally:
+                throttle.release()
+            throttle.record(username, verified)
+
+            if verified:
                 st.session_state['admin_logged_in'] = True
                 st.rerun()
             else:
                 st.error("Invalid credentials")
 
 
+@st.fragment(run_every=KITCHEN_REFRESH_SECONDS)
+def kitchen_display() -> None:
+    """Open orders by status, re-run on its own every few seconds
+
+    Only this fragment re-runs, and it reads the in-memory order board, so a
+    refresh costs O(open orders) and never touches the order history.
+    """
+    board = get_order_board()
+    index = get_menu_index()
+    columns = st.columns(len(OPEN_STATUSES))
+    for column, status in zip(columns, OPEN_STATUSES):
+        orders = board.orders(status)
+        with column:
+            st.subheader(f"{status.capitalize()} ({len(orders)})")
+            for order in orders:
+                with st.container(border=True):
+                    st.write(f"**{order['id']}** - {order['customer']} - {order['timestamp'][11:16]}")
+                    for item in order['items']:
+                        st.write(f"- {index.name_for(line_item_id(item))} x{item['quantity']}")
+                    if status == OUT_FOR_DELIVERY:
+                        st.caption(f"{order['address']}, {order['phone']}")
+                    for target in TRANSITIONS[status]:
+                        st.button(TRANSITION_LABELS[target], key=f"to_{target}_{order['id']}",
+                                  on_click=change_order_status, args=(order['id'], target))
+
+
+def inbox() -> None:
+    st.subheader("Inbox")
+    try:
+        store = get_message_store()
+        unread = store.unread_count()
+        unread_only = st.toggle("Unread only", key="inbox_unread_only")
+        total = store.count(unread_only)
+    except IOError as e:
+        st.error(f"Error loading messages: {str(e)}")
+        return
+
+    pages = max(1, -(-total // MESSAGES_PAGE_SIZE))
+    if st.session_state.setdefault('inbox_page', 1) > pages:
+        st.session_state['inbox_page'] = pages
+    page = st.number_input("Page", min_value=1, max_value=pages, key="inbox_page")
+    st.caption(f"{unread} unread, {total} messages, page {page} of {pages}")
+
+    try:
+        messages = store.page(MESSAGES_PAGE_SIZE, (page - 1) * MESSAGES_PAGE_SIZE, unread_only)
+    except IOError as e:
+        st.error(f"Error loading messages: {str(e)}")
+        return
+    unread_ids = [message['id'] for message in messages if not message['read']]
+    if unread_ids:
+        st.button("Mark page as read", on_click=mark_messages_read, args=(unread_ids,))
+    for message in messages:
+        marker = "" if message['read'] else "🔵 "
+        with st.expander(f"{marker}{message['name']} <{message['email']}> - {message['timestamp'][:16]}"):
+            st.write(message['message'])
+            if not message['read']:
+                st.button("Mark as read", key=f"read_{message['id']}",
+                          on_click=mark_messages_read, args=([message['id']],))
+
+
+def analytics() -> None:
+    st.subheader("Sales Analytics")
+    try:
+        stats = get_stats_store().load()
+    except IOError as e:
+        st.error(f"Error loading analytics: {str(e)}")
+        return
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Orders", stats.orders)
+    col2.metric("Revenue", f"${stats.revenue:,.2f}")
+    col3.metric("Average Basket", f"${stats.average_basket:.2f}")
+    col4.metric("Items per Order", f"{stats.average_items:.1f}")
+
+    if stats.orders:
+        st.write("**Revenue per Day**")
+        st.bar_chart(pd.Series({day: totals[1] for day, totals in sorted(stats.by_day.items())}, name="Revenue"))
+
+        col1, col2 = st.columns(2)
+        with col1:
+            st.write("**Revenue per Category**")
+            st.bar_chart(pd.Series(stats.by_category, name="Revenue"))
+        with col2:
+            st.write("**Orders per Hour**")
+            st.bar_chart(pd.Series(stats.by_hour, index=[f"{hour:02d}:00" for hour in range(24)], name="Orders"))
+
+        st.write("**Top Items**")
+        index = get_menu_index()
+        st.table([
+            {'Item': index.name_for(item_id), 'Quantity': quantity, 'Revenue': f"${revenue:.2f}"}
+            for item_id, quantity, revenue in stats.top_items()
+        ])
+
+    if st.button("Rebuild from Order History"):
+        try:
+            get_stats_store().rebuild(get_orders(), get_menu_index().categories_by_id())
+            st.rerun()
+        except IOError as e:
+            st.error(f"Error rebuilding analytics: {str(e)}")
+
+
+def diagnostics() -> None:
+    st.subheader("Diagnostics")
+    if not metrics.ENABLED:
+        st.info("Instrumentation is off. Unset RESTAURANT_METRICS (or set it to 1) and restart to turn it on.")
+        return
+
+    metrics.registry.recording = st.toggle("Record metrics", value=metrics.registry.recording)
+    snapshot = metrics.registry.snapshot()
+
+    st.write("**Page Renders and Storage Calls**")
+    st.table([
+        {
+            'Kind': timing['family'],
+            'Name': timing['label'],
+            'Calls': timing['count'],
+            'Avg (ms)': f"{1000 * timing['total_seconds'] / timing['count']:.1f}",
+            'p50 (ms)': f"{1000 * timing['p50_seconds']:.1f}",
+            'p99 (ms)': f"{1000 * timing['p99_seconds']:.1f}",
+            'Max (ms)': f"{1000 * timing['max_seconds']:.1f}",
+        }
+        for timing in snapshot['timings'] if timing['count']
+    ])
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.write("**Bytes Read / Written**")
+        st.table([
+            {'Direction': entry['direction'], 'Name': entry['label'], 'Bytes': entry['bytes']}
+            for entry in snapshot['bytes']
+        ])
+    with col2:
+        st.write("**Cache Hit Ratios**")
+        st.table([
+            {'Cache': entry['cache'], 'Hits': entry['hits'], 'Misses': entry['misses'],
+             'Hit Ratio': f"{entry['hit_ratio']:.1%}"}
+            for entry in snapshot['cache']
+        ])
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.download_button("Export JSON", metrics.registry.to_json(),
+                           file_name="metrics.json", mime="application/json")
+    with col2:
+        st.download_button("Export Prometheus", metrics.registry.to_prometheus(),
+                           file_name="metrics.prom", mime="text/plain")
+    with col3:
+        if st.button("Reset Metrics"):
+            metrics.registry.reset()
+            st.rerun()
+
+
 def admin_page() -> None:
     st.title("Admin Dashboard 💻")
 
@@ -274,7 +676,8 @@ def admin_page() -> None:
         st.session_state['admin_logged_in'] = False
         st.rerun()
 
-    tab1, tab2 = st.tabs(["Manage Menu", "View Orders"])
+    tab1, tab2, tab3, tab4, tab5, tab6 = st.tabs(
+        ["Manage Menu", "Kitchen", "View Orders", "Inbox", "Analytics", "Diagnostics"])
 
     with tab1:
         st.subheader("Add Menu Item")
@@ -282,11 +685,11 @@ def admin_page() -> None:
             name = st.text_input("Item Name")
             description = st.text_area("Description")
             price = st.number_input("Price", min_value=0.0, step=0.01)
-            category = st.selectbox("Category", ["Appetizer", "Main Course", "Dessert", "Beverage"])
+            category = st.selectbox("Category", CATEGORIES)
 
             if st.form_submit_button("Add Item"):
                 if name and description and price > 0:
-                    menu = load_menu()
+                    menu = list(load_menu())
                     menu.append({
                         'name': name,
                         'description': description,
@@ -298,33 +701,102 @@ def admin_page() -> None:
                 else:
                     st.error("Please fill in all fields with valid values")
 
-        st.subheader("Current Menu")
+        st.subheader("Import / Export Menu")
+        with st.form("import_menu", clear_on_submit=True):
+            upload = st.file_uploader("Menu file", type=["csv", "json"],
+                                      help="Columns: id (optional), name, description, price, category")
+            replace = st.checkbox("Replace the whole menu (remove items missing from the file)")
+            if st.form_submit_button("Import") and upload is not None:
+                import_uploaded_menu(upload.name, upload.getvalue(), replace)
+
         menu = load_menu()
-        for idx, item in enumerate(menu):
+        col1, col2 = st.columns(2)
+        with col1:
+            st.download_button("Export menu as CSV", export_menu_text(menu, 'csv'), "menu.csv", "text/csv")
+        with col2:
+            st.download_button("Export menu as JSON", export_menu_text(menu, 'json'), "menu.json", "application/json")
+
+        st.subheader("Current Menu")
+        for item in menu:
             col1, col2 = st.columns([3, 1])
             with col1:
                 st.write(f"**{item['name']}** - ${item['price']}")
                 st.write(item['description'])
             with col2:
-                if st.button("Delete", key=f"del_{idx}"):
-                    menu.pop(idx)
-                    save_menu(menu)
+                if st.button("Delete", key=f"del_{item['id']}"):
+                    save_menu([other for other in menu if other['id'] != item['id']])
                     st.rerun()
 
     with tab2:
+        kitchen_display()
+
+    with tab3:
         st.subheader("Orders")
-        orders = get_orders()
+        queue_stats = get_order_queue().stats()
+        st.caption(
+            f"Submission queue: {queue_stats['queue_depth']} waiting, "
+            f"{queue_stats['persisted']} saved since start, "
+            f"p50 {queue_stats['latency_p50_ms']:.0f} ms / p99 {queue_stats['latency_p99_ms']:.0f} ms to storage"
+        )
+        if not queue_stats['worker_alive']:
+            st.error("The order queue worker has stopped, new orders are not reaching storage. Restart the app.")
+        elif queue_stats['failures']:
+            st.warning(f"Saving orders failed {queue_stats['failures']} times since start, failed batches are retried")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            status = st.selectbox("Status", ["All", *ORDER_STATUSES], key="orders_status")
+        with col2:
+            today = date.today()
+            date_range = st.date_input("Date range", value=(today - timedelta(days=ORDERS_DEFAULT_DAYS - 1), today),
+                                       key="orders_dates", help="Clear it to search the whole history")
+        with col3:
+            search = st.text_input("Customer or phone", key="orders_search",
+                                   help="Matches the start of the name or phone number")
+
+        # Only the selected page is fetched from storage and rendered
+        filters: Dict[str, Optional[str]] = {
+            'status': None if status == "All" else status,
+            'since': None,
+            'until': None,
+            'search': search.strip() or None,
+        }
+        if date_range:
+            start = date_range[0]
+            end = date_range[1] if len(date_range) > 1 else start
+            filters['since'] = start.isoformat()
+            filters['until'] = (end + timedelta(days=1)).isoformat()
+
+        # The page lives only in session state, the widget gets no default
+        page = st.session_state.setdefault('orders_page', 1)
+        orders, total = query_page(ORDERS_PAGE_SIZE, (page - 1) * ORDERS_PAGE_SIZE, **filters)
+        pages = max(1, -(-total // ORDERS_PAGE_SIZE))
+        if page > pages:
+            # The filters now match fewer orders, show their last page
+            page = st.session_state['orders_page'] = pages
+            orders, total = query_page(ORDERS_PAGE_SIZE, (page - 1) * ORDERS_PAGE_SIZE, **filters)
+        page = st.number_input("Page", min_value=1, max_value=pages, key="orders_page")
+        st.caption(f"{total} orders, page {page} of {pages}")
+        index = get_menu_index()
         for order in orders:
-            with st.expander(f"Order from {order['customer']} - {order['timestamp']}"):
+            with st.expander(f"Order {order['id']} from {order['customer']} - {order['timestamp']}"):
                 st.write(f"**Customer:** {order['customer']}")
                 st.write(f"**Address:** {order['address']}")
                 st.write(f"**Phone:** {order['phone']}")
                 st.write("**Items:**")
                 for item in order['items']:
-                    st.write(f"- {item['name']} x{item['quantity']}")
+                    st.write(f"- {index.name_for(line_item_id(item))} x{item['quantity']}")
                 st.write(f"**Total:** ${order['total']:.2f}")
                 st.write(f"**Status:** {order['status']}")
 
+    with tab4:
+        inbox()
+
+    with tab5:
+        analytics()
+
+    with tab6:
+        diagnostics()
+
 
 def main() -> None:
     # Initialize session state
@@ -333,6 +805,7 @@ def main() -> None:
 
     # Initialize data
     load_data()
+    get_change_feed()
 
     # Navigation
     if not st.session_state['admin_logged_in']:
@@ -344,18 +817,19 @@ def main() -> None:
         page = "Admin Dashboard"
 
     # Display selected page
-    if page == "Home":
-        home_page()
-    elif page == "Delivery":
-        delivery_page()
-    elif page == "About Us":
-        about_us_page()
-    elif page == "Contact Us":
-        contact_us_page()
-    elif page == "Admin Login":
-        admin_login()
-    elif page == "Admin Dashboard":
-        admin_page()
+    with metrics.timed('page_render', page):
+        if page == "Home":
+            home_page()
+        elif page == "Delivery":
+            delivery_page()
+        elif page == "About Us":
+            about_us_page()
+        elif page == "Contact Us":
+            contact_us_page()
+        elif page == "Admin Login":
+            admin_login()
+        elif page == "Admin Dashboard":
+            admin_page()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,84 @@
+import hashlib
+import os
+import sys
+import threading
+from typing import Dict, Tuple
+
+from PIL import Image, features
+
+# Widths generated for every image, images are never scaled up
+WIDTHS = (480, 960, 1600)
+CACHE_DIR = 'images/.cache'
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.webp')
+
+# WebP when Pillow was built with it, JPEG otherwise
+FORMAT, EXTENSION = ('WEBP', '.webp') if features.check('webp') else ('JPEG', '.jpg')
+
+_variants: Dict[Tuple[str, int], Dict[int, str]] = {}
+_variants_lock = threading.Lock()
+
+
+def content_hash(path: str) -> str:
+    with open(path, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()[:16]
+
+
+def build_variants(path: str, cache_dir: str = CACHE_DIR) -> Dict[int, str]:
+    """Write resized copies of an image, returns width -> variant path
+
+    Variant names include a hash of the source bytes, so an edited image gets
+    new variants and existing ones are never rebuilt.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    digest = content_hash(path)
+
+    with Image.open(path) as image:
+        source_width = image.width
+        widths = sorted({min(width, source_width) for width in WIDTHS})
+        variants = {}
+        for width in widths:
+            variant_path = os.path.join(cache_dir, f"{stem}-{digest}-{width}{EXTENSION}")
+            variants[width] = variant_path
+            if os.path.exists(variant_path):
+                continue
+
+            has_alpha = image.mode in ('RGBA', 'LA') or 'transparency' in image.info
+            converted = image.convert('RGBA' if has_alpha and FORMAT == 'WEBP' else 'RGB')
+            height = round(image.height * width / source_width)
+            resized = converted.resize((width, height), Image.LANCZOS) if width != source_width else converted
+
+            # Write under a temporary name so readers never see a half-written file
+            tmp_path = variant_path + f".{os.getpid()}.tmp"
+            if FORMAT == 'WEBP':
+                resized.save(tmp_path, FORMAT, quality=80, method=4)
+            else:
+                resized.save(tmp_path, FORMAT, quality=80, optimize=True, progressive=True)
+            os.replace(tmp_path, variant_path)
+    return variants
+
+
+def asset_path(path: str, width: int) -> str:
+    """Smallest cached variant at least ``width`` pixels wide, built on first use"""
+    key = (path, os.stat(path).st_mtime_ns)
+    with _variants_lock:
+        variants = _variants.get(key)
+        if variants is None:
+            variants = _variants[key] = build_variants(path)
+    for variant_width in sorted(variants):
+        if variant_width >= width:
+            return variants[variant_width]
+    return variants[max(variants)]
+
+
+def build_all(images_dir: str = 'images', cache_dir: str = CACHE_DIR) -> None:
+    for name in sorted(os.listdir(images_dir)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            variants = build_variants(os.path.join(images_dir, name), cache_dir)
+            for width, variant_path in sorted(variants.items()):
+                print(f"{name} {width}px -> {variant_path} ({os.path.getsize(variant_path)} bytes)")
+
+
+if __name__ == "__main__":
+    # python assets.py [images_dir] -> prebuild every variant before deploying
+    build_all(*sys.argv[1:2])
@@ -0,0 +1,123 @@
+import base64
+import binascii
+import hashlib
+import hmac
+import os
+import re
+import threading
+import time
+from typing import Dict, List, Optional
+
+# scrypt cost parameters for new hashes, stored hashes keep the ones they were made with
+SCRYPT_N = int(os.environ.get('RESTAURANT_SCRYPT_N', 2 ** 14))
+SCRYPT_R = 8
+SCRYPT_P = 1
+SALT_BYTES = 16
+
+_LEGACY_SHA256 = re.compile(r'^[0-9a-f]{64}$')
+
+
+def _b64(data: bytes) -> str:
+    return base64.b64encode(data).decode('ascii')
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=128 * r * n * p * 2, dklen=32)
+
+
+def hash_password(password: str) -> str:
+    """Salted scrypt hash, stored as 'scrypt$n$r$p$salt$hash'"""
+    salt = os.urandom(SALT_BYTES)
+    digest = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+    return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64(salt)}${_b64(digest)}"
+
+
+def is_legacy_hash(stored_hash: str) -> bool:
+    """Unsalted SHA-256 hex digest, as written by earlier versions"""
+    return bool(_LEGACY_SHA256.match(stored_hash))
+
+
+def needs_rehash(stored_hash: str) -> bool:
+    """True for legacy hashes and scrypt hashes made with other cost parameters"""
+    if is_legacy_hash(stored_hash):
+        return True
+    _, n, r, p, _, _ = stored_hash.split('$')
+    return (int(n), int(r), int(p)) != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+
+def verify_password(password: str, stored_hash: Optional[str]) -> bool:
+    """Timing-safe check of a password against a stored hash
+
+    A missing hash is checked against a throwaway one so that unknown
+    usernames take as long as wrong passwords.
+    """
+    if stored_hash is None:
+        verify_password(password, _DUMMY_HASH)
+        return False
+    if is_legacy_hash(stored_hash):
+        candidate = hashlib.sha256(password.encode()).hexdigest()
+        return hmac.compare_digest(candidate, stored_hash)
+    try:
+        scheme, n, r, p, salt, digest = stored_hash.split('$')
+    except ValueError:
+        return False
+    if scheme != 'scrypt':
+        return False
+    try:
+        candidate = _scrypt(password, base64.b64decode(salt, validate=True), int(n), int(r), int(p))
+        expected = base64.b64decode(digest, validate=True)
+    except (ValueError, binascii.Error):
+        return False  # A corrupt entry in users.json fails the login, it must not crash it
+    return hmac.compare_digest(candidate, expected)
+
+
+_DUMMY_HASH = hash_password(os.urandom(16).hex())
+
+
+class LoginThrottle:
+    """Per-username limit on failed logins plus a cap on concurrent hashing
+
+    Attempts are refused before any storage read or password hashing, so a
+    flood of logins cannot pin the CPU or the disk.
+    """
+
+    def __init__(self, max_failures: int = 5, window: float = 300.0, max_concurrent: int = 2) -> None:
+        self.max_failures = max_failures
+        self.window = window
+        self._failures: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+        self._hashing = threading.BoundedSemaphore(max_concurrent)
+
+    def retry_after(self, username: str) -> float:
+        """Seconds until ``username`` may try again, 0 if it may try now"""
+        now = time.monotonic()
+        with self._lock:
+            recent = [t for t in self._failures.get(username, []) if now - t < self.window]
+            if recent:
+                self._failures[username] = recent
+            else:
+                self._failures.pop(username, None)
+            if len(recent) < self.max_failures:
+                return 0.0
+            return self.window - (now - recent[0])
+
+    def acquire(self) -> bool:
+        """Reserve a hashing slot without waiting, release it with ``release``"""
+        return self._hashing.acquire(blocking=False)
+
+    def release(self) -> None:
+        self._hashing.release()
+
+    def record(self, username: str, success: bool) -> None:
+        with self._lock:
+            if success:
+                self._failures.pop(username, None)
+            else:
+                self._failures.setdefault(username, []).append(time.monotonic())
+                if len(self._failures) > 10000:
+                    # Spraying many usernames must not grow this forever
+                    cutoff = time.monotonic() - self.window
+                    self._failures = {
+                        name: times for name, times in self._failures.items() if times[-1] > cutoff
+                    }
@@ -0,0 +1,271 @@
+"""Load test for the data layer and page renders
+
+Generates a synthetic menu and order history in a temporary data directory,
+then drives the storage functions of app.py from many threads, and
+optionally renders whole pages through Streamlit's AppTest from several
+processes. Results can be saved as a baseline and compared against later
+runs:
+
+    python benchmark.py --sizes 1000 100000 --backends json sqlite --save
+    python benchmark.py --sizes 1000 --compare benchmarks/<commit>.json
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List
+
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, APP_DIR)
+
+import streamlit as st  # noqa: E402
+
+import app  # noqa: E402
+from auth import hash_password  # noqa: E402
+from menu import CATEGORIES  # noqa: E402
+from order_queue import percentile  # noqa: E402
+from order_status import CANCELLED, DELIVERED, OPEN_STATUSES, PENDING  # noqa: E402
+from storage import open_storage  # noqa: E402
+
+BENCH_USER = ("bench", "bench-password")
+
+
+def synthetic_menu(count: int) -> List[Dict[str, Any]]:
+    return [
+        {
+            'id': f"item-{i}",
+            'name': f"Item {i}",
+            'description': f"Synthetic menu item number {i}.",
+            'price': round(3 + (i % 40) * 0.75, 2),
+            'category': CATEGORIES[i % len(CATEGORIES)],
+        }
+        for i in range(count)
+    ]
+
+
+def synthetic_order(rng: random.Random, menu: List[Dict[str, Any]], when: datetime,
+                    status: str = PENDING) -> Dict[str, Any]:
+    items = [
+        {'item_id': item['id'], 'quantity': rng.randint(1, 3), 'price': item['price']}
+        for item in rng.sample(menu, rng.randint(1, 4))
+    ]
+    return {
+        'customer': f"Customer {rng.randint(0, 50000)}",
+        'address': f"{rng.randint(1, 200)} Synthetic Street",
+        'phone': f"07{rng.randint(10000000, 99999999)}",
+        'items': items,
+        'total': round(sum(item['quantity'] * item['price'] for item in items), 2),
+        'timestamp': when.isoformat(),
+        'status': status,
+    }
+
+
+def synthetic_status(rng: random.Random, when: datetime) -> str:
+    # Earlier days are closed, a few orders were cancelled; today's are still moving
+    if when.date() < datetime.now().date():
+        return CANCELLED if rng.random() < 0.05 else DELIVERED
+    return rng.choice(OPEN_STATUSES)
+
+
+def generate_data(data_dir: str, backend: str, orders: int, menu_items: int, seed: int) -> None:
+    """Write a synthetic menu, user and order history spread over the last year"""
+    os.makedirs(data_dir, exist_ok=True)
+    rng = random.Random(seed)
+    menu = synthetic_menu(menu_items)
+    start = datetime.now() - timedelta(days=365)
+    step = timedelta(days=365) / max(orders, 1)
+
+    storage = open_storage(backend, data_dir)
+    storage.save_menu(menu)
+    storage.set_user_hash(BENCH_USER[0], hash_password(BENCH_USER[1]))
+    chunk = 10000
+    for first in range(0, orders, chunk):
+        whens = [start + step * i for i in range(first, min(first + chunk, orders))]
+        storage.save_orders([synthetic_order(rng, menu, when, synthetic_status(rng, when)) for when in whens])
+    # Archive and compact like a server that has been running all year
+    storage.maintain()
+
+
+def summarise(name: str, latencies: List[float], elapsed: float) -> Dict[str, Any]:
+    return {
+        'operation': name,
+        'calls': len(latencies),
+        'throughput_per_s': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+    }
+
+
+def timed_calls(name: str, fn: Callable[[], Any], count: int, threads: int) -> Dict[str, Any]:
+    """Run ``fn`` ``count`` times across ``threads`` threads and summarise latency"""
+    def one(_: int) -> float:
+        start = time.perf_counter()
+        fn()
+        return time.perf_counter() - start
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, range(count)))
+    return summarise(name, latencies, time.perf_counter() - started)
+
+
+def render_page(page: str) -> float:
+    """Render one page in a fresh AppTest session, returns the time taken"""
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    at = AppTest.from_file(os.path.join(APP_DIR, 'app.py'), default_timeout=60)
+    if page == "Admin Dashboard":
+        at.session_state['admin_logged_in'] = True
+        at.run()
+    else:
+        at.run()
+        at.sidebar.selectbox[0].select(page)
+        at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+    return time.perf_counter() - start
+
+
+def page_renders(page: str, count: int, workers: int) -> Dict[str, Any]:
+    # AppTest drives a process-wide Streamlit runtime, so concurrent sessions
+    # get a process each. They share data/ the way several servers would.
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+        latencies = list(pool.map(render_page, [page] * count))
+    return summarise(f"render {page}", latencies, time.perf_counter() - started)
+
+
+def run_scenario(backend: str, orders: int, args: argparse.Namespace) -> Dict[str, Any]:
+    work_dir = tempfile.mkdtemp(prefix='restaurant-bench-')
+    try:
+        generate_data(os.path.join(work_dir, 'data'), backend, orders, args.menu_items, args.seed)
+        shutil.copytree(os.path.join(APP_DIR, 'images'), os.path.join(work_dir, 'images'))
+        os.chdir(work_dir)
+        os.environ['RESTAURANT_STORAGE'] = backend
+        st.cache_resource.clear()
+        # Start the queue, the stats store and the board before timing anything
+        app.get_order_board()
+
+        rng = random.Random(args.seed + 1)
+        menu = list(app.load_menu())
+        submitted: List[str] = []
+
+        def place_order() -> None:
+            order_id = app.save_order(synthetic_order(rng, menu, datetime.now()))
+            if order_id is not None:
+                submitted.append(order_id)
+
+        results = [
+            timed_calls('load_menu', app.load_menu, args.ops, args.threads),
+            timed_calls('save_order', place_order, args.ops, args.threads),
+            timed_calls('verify_user', lambda: app.verify_user(*BENCH_USER), args.logins, args.threads),
+            timed_calls('query_orders (1 page)', lambda: app.query_orders(20), args.ops, args.threads),
+            timed_calls('get_orders (full)', app.get_orders, args.full_scans, args.threads),
+        ]
+        if args.apptest:
+            for page in ("Home", "Delivery", "Admin Dashboard"):
+                results.append(page_renders(page, args.renders, args.render_workers))
+
+        # Lost writes: confirmed orders that never reached storage
+        queue = app.get_order_queue()
+        deadline = time.monotonic() + 120
+        while queue.stats()['queue_depth'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        stored = app.get_storage().existing_order_ids(submitted)
+
+        return {
+            'backend': backend,
+            'orders': orders,
+            'results': results,
+            'lost_writes': len(set(submitted) - stored),
+            'queue': queue.stats(),
+        }
+    finally:
+        os.chdir(APP_DIR)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def print_report(report: Dict[str, Any], baseline: Dict[str, Any]) -> None:
+    previous = {
+        (scenario['backend'], scenario['orders'], result['operation']): result
+        for scenario in baseline.get('scenarios', [])
+        for result in scenario['results']
+    }
+    for scenario in report['scenarios']:
+        print(f"\n{scenario['backend']} backend, {scenario['orders']} orders "
+              f"(lost writes: {scenario['lost_writes']})")
+        print(f"  {'operation':28} {'ops/s':>10} {'p50 ms':>9} {'p99 ms':>9}")
+        for result in scenario['results']:
+            line = (f"  {result['operation']:28} {result['throughput_per_s']:10.1f} "
+                    f"{result['p50_ms']:9.2f} {result['p99_ms']:9.2f}")
+            before = previous.get((scenario['backend'], scenario['orders'], result['operation']))
+            if before and before['p50_ms']:
+                line += f"  p50 {100 * (result['p50_ms'] / before['p50_ms'] - 1):+.0f}% vs {baseline['commit']}"
+            print(line)
+    line = f"\npeak RSS: {report['peak_rss_mb']:.1f} MB"
+    if report['peak_rss_children_mb'] is not None:
+        line += f", largest render process: {report['peak_rss_children_mb']:.1f} MB"
+    print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000], help="order history sizes")
+    parser.add_argument('--backends', nargs='+', default=['json', 'sqlite'], choices=['json', 'sqlite'])
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--ops', type=int, default=500, help="calls per cheap operation")
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--full-scans', type=int, default=5)
+    parser.add_argument('--menu-items', type=int, default=200)
+    parser.add_argument('--apptest', action='store_true', help="also time page renders through AppTest")
+    parser.add_argument('--renders', type=int, default=10, help="renders per page")
+    parser.add_argument('--render-workers', type=int, default=4, help="processes rendering pages at once")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save', action='store_true', help="save results to benchmarks/<commit>.json")
+    parser.add_argument('--compare', help="baseline JSON file to compare against")
+    args = parser.parse_args()
+
+    report: Dict[str, Any] = {
+        'commit': git_commit(),
+        'date': datetime.now().isoformat(),
+        'scenarios': [run_scenario(backend, size, args) for size in args.sizes for backend in args.backends],
+        # ru_maxrss is in kilobytes on Linux. Children are the page render
+        # processes, without renders the only child is git rev-parse
+        'peak_rss_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'peak_rss_children_mb': (resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+                                 if args.apptest else None),
+    }
+
+    baseline: Dict[str, Any] = {}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.save:
+        os.makedirs(os.path.join(APP_DIR, 'benchmarks'), exist_ok=True)
+        path = os.path.join(APP_DIR, 'benchmarks', f"{report['commit']}.json")
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved baseline to {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+import threading
+from typing import Callable, Dict, Hashable, List, Optional
+
+from storage import Storage
+
+# Returns False when it could not act on the change yet, it is then called
+# again on the next poll
+Subscriber = Callable[[], Optional[bool]]
+
+
+class ChangeFeed:
+    """Notices changes that any process makes to the menu, users or orders
+
+    A background thread asks storage for its version tokens every
+    ``interval`` seconds, a few stat() calls for the JSON files or one small
+    query for SQLite. The tokens are handed to storage, whose caches then
+    trust them instead of checking on every read, and subscribers of the
+    data sets that changed are called.
+
+    Polling is used rather than inotify so it works with both backends, on
+    every platform and without extra dependencies.
+    """
+
+    def __init__(self, storage: Storage, interval: float = 0.5) -> None:
+        self.storage = storage
+        self.interval = interval
+        self._subscribers: List[List] = []  # [name, callback, version it last handled]
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.versions: Dict[str, Hashable] = storage.versions()
+        storage.set_known_versions(self.versions)
+
+    def subscribe(self, name: str, callback: Subscriber) -> None:
+        """Call ``callback`` whenever ``name`` ('menu', 'users' or 'orders') changes"""
+        with self._lock:
+            self._subscribers.append([name, callback, self.versions[name]])
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name='change-feed', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def poll(self) -> None:
+        """Check for changes once"""
+        self.versions = self.storage.versions()
+        self.storage.set_known_versions(self.versions)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            name, callback, handled = subscriber
+            version = self.versions[name]
+            if version != handled and callback() is not False:
+                subscriber[2] = version
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.poll()
+            except Exception:
+                # Storage is unavailable or a subscriber failed: go back to checking
+                # on every read rather than trusting versions that may be stale, and
+                # keep polling, the failed subscribers are called again next time
+                self.storage.set_known_versions(None)
@@ -0,0 +1,81 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Hashable, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows has no fcntl, fall back to in-process locking
+    fcntl = None
+
+_thread_locks: Dict[str, threading.Lock] = {}
+_thread_locks_guard = threading.Lock()
+
+
+def _thread_lock(path: str) -> threading.Lock:
+    with _thread_locks_guard:
+        if path not in _thread_locks:
+            _thread_locks[path] = threading.Lock()
+        return _thread_locks[path]
+
+
+@contextmanager
+def file_lock(path: str, exclusive: bool = True) -> Iterator[None]:
+    """Hold an advisory lock on a lock file for the duration of the block"""
+    if fcntl is None:
+        # No shared locks without fcntl, every holder is exclusive
+        with _thread_lock(path):
+            yield
+        return
+
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        yield
+    finally:
+        os.close(fd)
+
+
+def try_lock(path: str) -> Optional[int]:
+    """Take an exclusive lock without waiting, returns the fd to keep it held
+
+    The lock lasts until the fd is closed or the process exits, which lets
+    other processes tell whether the owner of a file is still alive.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+    if fcntl is None:
+        return fd
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        os.close(fd)
+        return None
+    return fd
+
+
+def file_version(path: str) -> Hashable:
+    """Token that changes whenever the file is written or replaced, None if missing"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_ino, st.st_mtime_ns, st.st_size
+
+
+def atomic_write(path: str, data: str) -> None:
+    """Replace a file so readers see either the old or the new contents
+
+    The data goes to a temporary file in the same directory, is fsynced and
+    then renamed over ``path``, a crash leaves the old file in place.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
@@ -1,6 +1,7 @@
 import json
 import os
-import hashlib
+
+from auth import hash_password
 
 
 def initialize_admin():
@@ -8,8 +9,8 @@ def initialize_admin():
     admin_username = "admin"
     admin_password = "admin123"
 
-    # Create hashed password
-    hashed_password = hashlib.sha256(admin_password.encode()).hexdigest()
+    # Create salted password hash
+    hashed_password = hash_password(admin_password)
 
     # Create users dictionary
     users = {
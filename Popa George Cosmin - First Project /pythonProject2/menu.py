@@ -0,0 +1,69 @@
+import re
+from typing import Any, Dict, List, Mapping, MutableMapping, Sequence, Tuple
+
+MenuItem = Mapping[str, Any]
+
+CATEGORIES = ("Appetizer", "Main Course", "Dessert", "Beverage")
+
+
+def make_item_id(name: str) -> str:
+    """Readable id derived from an item name, e.g. 'Grilled Salmon' -> 'grilled-salmon'"""
+    return re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-') or 'item'
+
+
+def assign_ids(menu_items: Sequence[MutableMapping[str, Any]]) -> None:
+    """Give every item without an ``id`` a unique one, existing ids are kept
+
+    Items from before ids existed get the id of their name, so they keep the
+    same id on every load even before the menu is saved again.
+    """
+    taken = {item['id'] for item in menu_items if 'id' in item}
+    for item in menu_items:
+        if 'id' in item:
+            continue
+        base = make_item_id(item['name'])
+        item_id = base
+        suffix = 2
+        while item_id in taken:
+            item_id = f"{base}-{suffix}"
+            suffix += 1
+        item['id'] = item_id
+        taken.add(item_id)
+
+
+def line_item_id(line_item: Mapping[str, Any]) -> str:
+    """Menu item id of an order line, older orders only stored the item name"""
+    if 'item_id' in line_item:
+        return line_item['item_id']
+    return make_item_id(line_item['name'])
+
+
+class MenuIndex:
+    """Lookups by id and by category over one immutable menu
+
+    The index only holds references to the menu's own items, so it costs a
+    couple of dict entries per item rather than a copy of the menu.
+    """
+
+    def __init__(self, menu: Sequence[MenuItem]) -> None:
+        self.by_id: Dict[str, MenuItem] = {}
+        by_category: Dict[str, List[MenuItem]] = {}
+        for item in menu:
+            self.by_id[item['id']] = item
+            by_category.setdefault(item['category'], []).append(item)
+        self.by_category: Dict[str, Tuple[MenuItem, ...]] = {
+            category: tuple(items) for category, items in by_category.items()
+        }
+
+    @property
+    def categories(self) -> List[str]:
+        """Categories in the order they first appear on the menu"""
+        return list(self.by_category)
+
+    def name_for(self, item_id: str) -> str:
+        """Display name for an item id, items removed from the menu show their id"""
+        item = self.by_id.get(item_id)
+        return item['name'] if item is not None else item_id
+
+    def categories_by_id(self) -> Dict[str, str]:
+        return {item_id: item['category'] for item_id, item in self.by_id.items()}
@@ -0,0 +1,205 @@
+import argparse
+import csv
+import io
+import json
+import os
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, IO, Iterable, Iterator, List, Mapping, NamedTuple, Sequence
+
+from menu import CATEGORIES, assign_ids
+from storage import Storage, open_storage
+
+FIELDS = ('id', 'name', 'description', 'price', 'category')
+FORMATS = ('csv', 'json')
+MAX_PRICE = Decimal('10000')
+
+
+class MenuImportError(ValueError):
+    """An import file failed validation, nothing was written"""
+
+    def __init__(self, errors: List[str]) -> None:
+        super().__init__(f"{len(errors)} problem(s) in the menu file: " + "; ".join(errors[:5]))
+        self.errors = errors
+
+
+class ImportResult(NamedTuple):
+    created: int
+    updated: int
+    removed: int
+
+
+def format_for(filename: str) -> str:
+    """'csv' or 'json' from a file name's extension"""
+    extension = os.path.splitext(filename)[1].lower().lstrip('.')
+    if extension not in FORMATS:
+        raise ValueError(f"Unsupported menu file type: {filename} (use .csv or .json)")
+    return extension
+
+
+def read_rows(stream: IO[str], fmt: str) -> Iterator[Dict[str, Any]]:
+    """Raw menu rows from a CSV file (one row at a time) or a JSON list"""
+    if fmt == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    try:
+        items = json.load(stream)
+    except ValueError as e:
+        raise MenuImportError([f"invalid JSON: {e}"])
+    if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+        raise MenuImportError(["a JSON menu must be a list of objects"])
+    yield from items
+
+
+def validate_rows(rows: Iterable[Mapping[str, Any]]) -> List[Dict[str, Any]]:
+    """Normalised menu items, raises MenuImportError listing every bad row"""
+    items: List[Dict[str, Any]] = []
+    errors: List[str] = []
+    seen_ids: Dict[str, int] = {}
+    seen_names: Dict[str, int] = {}
+
+    for number, row in enumerate(rows, start=1):
+        item_id = str(row.get('id') or '').strip()
+        name = str(row.get('name') or '').strip()
+        description = str(row.get('description') or '').strip()
+        category = str(row.get('category') or '').strip()
+        problems = []
+
+        if not name:
+            problems.append("missing name")
+        elif name.lower() in seen_names:
+            problems.append(f"duplicate name '{name}' (row {seen_names[name.lower()]})")
+        if item_id and item_id in seen_ids:
+            problems.append(f"duplicate id '{item_id}' (row {seen_ids[item_id]})")
+        if category not in CATEGORIES:
+            problems.append(f"unknown category '{category}'")
+        try:
+            price = Decimal(str(row.get('price', '')).strip())
+            if not price.is_finite() or price <= 0 or price > MAX_PRICE or price != round(price, 2):
+                problems.append(f"price must be between 0.01 and {MAX_PRICE} with at most 2 decimals")
+        except InvalidOperation:
+            problems.append(f"price '{row.get('price', '')}' is not a number")
+
+        if problems:
+            errors.extend(f"row {number}: {problem}" for problem in problems)
+            continue
+        seen_names[name.lower()] = number
+        if item_id:
+            seen_ids[item_id] = number
+
+        item = {'name': name, 'description': description, 'price': float(price), 'category': category}
+        if item_id:
+            item['id'] = item_id
+        items.append(item)
+
+    if errors:
+        raise MenuImportError(errors)
+    if not items:
+        raise MenuImportError(["the file has no menu items"])
+    return items
+
+
+def merge_menu(current: Sequence[Mapping[str, Any]],
+               imported: List[Dict[str, Any]],
+               replace: bool = False) -> List[Dict[str, Any]]:
+    """Create or update items by id, or by name for rows without an id
+
+    Updated items keep their place and id. With ``replace`` the menu becomes
+    exactly the imported items, otherwise items missing from the file stay.
+    Raises MenuImportError if a row would give an item the name of another
+    item that stays on the menu.
+    """
+    menu = [dict(item) for item in current]
+    by_id = {item['id']: item for item in menu}
+    by_name = {item['name'].lower(): item for item in menu}
+
+    imported_ids = set()
+    merged = []  # (row number, item it ended up in)
+    for number, item in enumerate(imported, start=1):
+        existing = by_id.get(item['id']) if 'id' in item else by_name.get(item['name'].lower())
+        if existing is not None:
+            existing.update(item)
+            imported_ids.add(existing['id'])
+            merged.append((number, existing))
+        else:
+            menu.append(item)
+            merged.append((number, item))
+
+    assign_ids(menu)
+    if replace:
+        new_ids = {item['id'] for item in menu[len(current):]}
+        menu = [item for item in menu if item['id'] in imported_ids or item['id'] in new_ids]
+
+    # Names are unique within the file, so a clash is with an item already on the menu
+    owners: Dict[str, List[str]] = {}
+    for item in menu:
+        owners.setdefault(item['name'].lower(), []).append(item['id'])
+    errors = [
+        f"row {number}: name '{item['name']}' is already used by item '{other}'"
+        for number, item in merged
+        for other in owners.get(item['name'].lower(), ())
+        if other != item['id']
+    ]
+    if errors:
+        raise MenuImportError(errors)
+    return menu
+
+
+def import_menu(storage: Storage, stream: IO[str], fmt: str, replace: bool = False) -> ImportResult:
+    """Validate a whole menu file, then apply it with a single save_menu"""
+    imported = validate_rows(read_rows(stream, fmt))
+    current = storage.load_menu()
+    menu = merge_menu(current, imported, replace)
+
+    current_ids = {item['id'] for item in current}
+    new_ids = {item['id'] for item in menu}
+    storage.save_menu(menu)
+    return ImportResult(
+        created=len(new_ids - current_ids),
+        updated=len(imported) - len(new_ids - current_ids),
+        removed=len(current_ids - new_ids),
+    )
+
+
+def export_menu(menu: Iterable[Mapping[str, Any]], stream: IO[str], fmt: str) -> None:
+    """Write the menu as CSV (one row at a time) or as a JSON list"""
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for item in menu:
+            writer.writerow(item)
+    else:
+        json.dump([{field: item[field] for field in FIELDS} for item in menu], stream, indent=2)
+
+
+def export_menu_text(menu: Iterable[Mapping[str, Any]], fmt: str) -> str:
+    buffer = io.StringIO()
+    export_menu(menu, buffer, fmt)
+    return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    # python menu_io.py import seasonal.csv [--replace]
+    # python menu_io.py export menu.json
+    parser = argparse.ArgumentParser(description="Bulk import or export the restaurant menu")
+    parser.add_argument('action', choices=['import', 'export'])
+    parser.add_argument('path', help="a .csv or .json file")
+    parser.add_argument('--replace', action='store_true', help="drop menu items that are not in the file")
+    parser.add_argument('--backend', default=os.environ.get('RESTAURANT_STORAGE', 'json'), choices=['json', 'sqlite'])
+    args = parser.parse_args()
+
+    menu_storage = open_storage(args.backend)
+    file_format = format_for(args.path)
+    if args.action == 'export':
+        with open(args.path, 'w', encoding='utf-8', newline='') as f:
+            export_menu(menu_storage.load_menu(), f, file_format)
+        print(f"Exported {len(menu_storage.load_menu())} menu items to {args.path}")
+    else:
+        try:
+            with open(args.path, 'r', encoding='utf-8-sig', newline='') as f:
+                result = import_menu(menu_storage, f, file_format, args.replace)
+        except MenuImportError as e:
+            print("Nothing was imported:")
+            for error in e.errors:
+                print(f"  {error}")
+            raise SystemExit(1)
+        print(f"Imported {args.path}: {result.created} created, {result.updated} updated, {result.removed} removed")
@@ -0,0 +1,150 @@
+import atexit
+import json
+import os
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List
+
+import metrics
+from fileutil import file_lock
+
+
+class MessageStore:
+    """Contact messages in an append-only JSONL log with a write-behind buffer
+
+    ``submit`` only puts the message in memory, a background thread writes
+    everything buffered with one append and one fsync every
+    ``flush_interval`` seconds (sooner once ``batch_size`` is reached), so a
+    burst of messages costs a handful of disk writes. A crash can lose the
+    last ``flush_interval`` seconds of messages.
+
+    Reads are served from an in-memory index that follows the log by reading
+    only what was appended since the last read, which also picks up messages
+    written by other processes.
+    """
+
+    def __init__(self, path: str = 'data/messages.jsonl', flush_interval: float = 1.0, batch_size: int = 200) -> None:
+        self.path = path
+        self.lock_path = path + '.lock'
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+
+        self._buffer: List[Dict[str, Any]] = []
+        self._buffer_lock = threading.Lock()
+        self._wake = threading.Event()
+
+        self._index_lock = threading.Lock()
+        self._offset = 0
+        self._messages: List[Dict[str, Any]] = []  # oldest first
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._unread: Dict[str, Dict[str, Any]] = {}  # insertion ordered, oldest first
+
+        self._worker = threading.Thread(target=self._run, name='message-flush', daemon=True)
+        self._worker.start()
+        atexit.register(self.flush)
+
+    def submit(self, name: str, email: str, message: str) -> str:
+        """Buffer a new message and return its id"""
+        message_id = uuid.uuid4().hex[:12]
+        self._add_record({'message': {
+            'id': message_id,
+            'name': name,
+            'email': email,
+            'message': message,
+            'timestamp': datetime.now().isoformat(),
+        }})
+        return message_id
+
+    def mark_read(self, message_ids: List[str]) -> None:
+        """Record messages as read, written at once so the inbox updates immediately"""
+        for message_id in message_ids:
+            self._add_record({'read': message_id})
+        self.flush()
+
+    def _add_record(self, record: Dict[str, Any]) -> None:
+        with self._buffer_lock:
+            self._buffer.append(record)
+            if len(self._buffer) >= self.batch_size:
+                self._wake.set()
+
+    def flush(self) -> None:
+        """Write everything buffered with a single append"""
+        with self._buffer_lock:
+            records, self._buffer = self._buffer, []
+        if not records:
+            return
+        data = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records).encode('utf-8')
+        try:
+            with file_lock(self.lock_path):
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, data)
+                    os.fsync(fd)
+                finally:
+                    os.close(fd)
+        except IOError:
+            # Keep the batch for the next flush, ahead of anything newer
+            with self._buffer_lock:
+                self._buffer[:0] = records
+            raise
+        metrics.add_bytes('write', os.path.basename(self.path), len(data))
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except IOError:
+                pass  # Retried on the next tick, the messages are still buffered
+
+    def _refresh(self) -> None:
+        # Caller holds _index_lock
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            return
+        if size <= self._offset:
+            return
+        with file_lock(self.lock_path, exclusive=False):
+            with open(self.path, 'rb') as f:
+                f.seek(self._offset)
+                data = f.read()
+        metrics.add_bytes('read', os.path.basename(self.path), len(data))
+        # Only whole lines, a line still being written is read next time
+        data = data[:data.rfind(b'\n') + 1]
+        self._offset += len(data)
+        for line in data.splitlines():
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if 'message' in record:
+                message = record['message']
+                message['read'] = False
+                self._messages.append(message)
+                self._by_id[message['id']] = message
+                self._unread[message['id']] = message
+            elif record.get('read') in self._by_id:
+                self._by_id[record['read']]['read'] = True
+                self._unread.pop(record['read'], None)
+
+    def unread_count(self) -> int:
+        with self._index_lock:
+            self._refresh()
+            return len(self._unread)
+
+    def count(self, unread_only: bool = False) -> int:
+        with self._index_lock:
+            self._refresh()
+            return len(self._unread if unread_only else self._messages)
+
+    def page(self, limit: int, offset: int = 0, unread_only: bool = False) -> List[Dict[str, Any]]:
+        """Messages newest first, copied so callers cannot change the index"""
+        with self._index_lock:
+            self._refresh()
+            messages = list(self._unread.values()) if unread_only else self._messages
+            end = len(messages) - offset
+            start = max(0, end - limit)
+            return [dict(message) for message in reversed(messages[start:max(end, 0)])]
@@ -0,0 +1,188 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Any, ContextManager, Dict, Iterator, List, Tuple
+
+# RESTAURANT_METRICS=0 turns instrumentation off for the whole process: the
+# storage backend is then not wrapped at all and every helper below returns
+# after a single flag check.
+ENABLED = os.environ.get('RESTAURANT_METRICS', '1') != '0'
+
+# Histogram bucket upper bounds in seconds, shared by every timing
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, float('inf'))
+
+_NOOP = nullcontext()
+
+
+class Timing:
+    """Count, sum, max and bucket counts of one timed operation"""
+
+    def __init__(self) -> None:
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.buckets[i] += 1
+                break
+
+    def quantile(self, fraction: float) -> float:
+        """Upper bound of the bucket holding the given quantile"""
+        target = fraction * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= target and count:
+                return min(bound, self.max)
+        return self.max
+
+
+class Registry:
+    """Process-wide timings, byte counters and cache hit counters"""
+
+    def __init__(self) -> None:
+        self.recording = True
+        self._lock = threading.Lock()
+        self.timings: Dict[Tuple[str, str], Timing] = {}
+        self.bytes: Dict[Tuple[str, str], int] = {}
+        self.cache: Dict[str, List[int]] = {}  # cache -> [hits, misses]
+
+    def observe(self, family: str, label: str, seconds: float) -> None:
+        with self._lock:
+            timing = self.timings.get((family, label))
+            if timing is None:
+                timing = self.timings[(family, label)] = Timing()
+            timing.observe(seconds)
+
+    def add_bytes(self, direction: str, label: str, count: int) -> None:
+        with self._lock:
+            self.bytes[(direction, label)] = self.bytes.get((direction, label), 0) + count
+
+    def cache_lookup(self, cache: str, hit: bool) -> None:
+        with self._lock:
+            counts = self.cache.setdefault(cache, [0, 0])
+            counts[0 if hit else 1] += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.timings.clear()
+            self.bytes.clear()
+            self.cache.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'timings': [
+                    {
+                        'family': family,
+                        'label': label,
+                        'count': timing.count,
+                        'total_seconds': timing.total,
+                        'max_seconds': timing.max,
+                        'p50_seconds': timing.quantile(0.50),
+                        'p99_seconds': timing.quantile(0.99),
+                        'buckets': dict(zip(map(str, BUCKETS), timing.buckets)),
+                    }
+                    for (family, label), timing in sorted(self.timings.items())
+                ],
+                'bytes': [
+                    {'direction': direction, 'label': label, 'bytes': count}
+                    for (direction, label), count in sorted(self.bytes.items())
+                ],
+                'cache': [
+                    {
+                        'cache': cache,
+                        'hits': hits,
+                        'misses': misses,
+                        'hit_ratio': hits / (hits + misses) if hits + misses else 0.0,
+                    }
+                    for cache, (hits, misses) in sorted(self.cache.items())
+                ],
+            }
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        """Prometheus text exposition format"""
+        lines = []
+        with self._lock:
+            families = sorted({family for family, _ in self.timings})
+            for family in families:
+                name = f"restaurant_{family}_seconds"
+                lines.append(f"# TYPE {name} histogram")
+                for (timing_family, label), timing in sorted(self.timings.items()):
+                    if timing_family != family:
+                        continue
+                    cumulative = 0
+                    for bound, count in zip(BUCKETS, timing.buckets):
+                        cumulative += count
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f'{name}_bucket{{name="{label}",le="{le}"}} {cumulative}')
+                    lines.append(f'{name}_sum{{name="{label}"}} {timing.total}')
+                    lines.append(f'{name}_count{{name="{label}"}} {timing.count}')
+
+            lines.append("# TYPE restaurant_storage_bytes_total counter")
+            for (direction, label), count in sorted(self.bytes.items()):
+                lines.append(f'restaurant_storage_bytes_total{{direction="{direction}",name="{label}"}} {count}')
+
+            lines.append("# TYPE restaurant_cache_lookups_total counter")
+            for cache, (hits, misses) in sorted(self.cache.items()):
+                lines.append(f'restaurant_cache_lookups_total{{cache="{cache}",result="hit"}} {hits}')
+                lines.append(f'restaurant_cache_lookups_total{{cache="{cache}",result="miss"}} {misses}')
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+
+@contextmanager
+def _timed(family: str, label: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        registry.observe(family, label, time.perf_counter() - start)
+
+
+def timed(family: str, label: str) -> ContextManager[None]:
+    """Time the block into the ``family`` histogram under ``label``"""
+    if not ENABLED or not registry.recording:
+        return _NOOP
+    return _timed(family, label)
+
+
+def add_bytes(direction: str, label: str, count: int) -> None:
+    """Count bytes read or written by storage, ``direction`` is 'read' or 'write'"""
+    if ENABLED and registry.recording:
+        registry.add_bytes(direction, label, count)
+
+
+def cache_lookup(cache: str, hit: bool) -> None:
+    if ENABLED and registry.recording:
+        registry.cache_lookup(cache, hit)
+
+
+class InstrumentedStorage:
+    """Wraps a storage backend and times every public method call"""
+
+    def __init__(self, storage: Any) -> None:
+        self._storage = storage
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._storage, name)
+        if name.startswith('_') or not callable(attr):
+            return attr
+
+        def call(*args: Any, **kwargs: Any) -> Any:
+            with timed('storage_call', name):
+                return attr(*args, **kwargs)
+        return call
@@ -0,0 +1,138 @@
+import gzip
+import io
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import IO, Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+import metrics
+from fileutil import file_lock
+
+try:
+    import zstandard
+except ImportError:  # zstd partitions need the optional zstandard package
+    zstandard = None
+
+EXTENSIONS = {'gzip': '.jsonl.gz', 'zstd': '.jsonl.zst'}
+_PARTITION = re.compile(r'^orders-(\d{4}-\d{2}(?:-\d{2})?)\.jsonl\.(gz|zst)$')
+
+
+class OrderArchive:
+    """Closed orders from past days, in compressed JSONL partitions
+
+    One file per month (or per day with ``granularity='day'``), named after
+    the period it covers, so a date range query only opens the partitions
+    that overlap it. Partitions are written once by a rollover and then only
+    read, recently read ones are kept parsed in memory.
+    """
+
+    def __init__(self,
+                 archive_dir: str = 'data/archive',
+                 granularity: str = 'month',
+                 compression: str = os.environ.get('RESTAURANT_ARCHIVE_COMPRESSION', 'gzip'),
+                 cached_partitions: int = 24) -> None:
+        if granularity not in ('month', 'day'):
+            raise ValueError(f"Unknown archive granularity: {granularity}")
+        if compression not in EXTENSIONS:
+            raise ValueError(f"Unknown archive compression: {compression}")
+        if compression == 'zstd' and zstandard is None:
+            raise ValueError("zstd archives need the zstandard package (pip install zstandard)")
+        self.archive_dir = archive_dir
+        self.key_length = 7 if granularity == 'month' else 10
+        self.compression = compression
+        self.cached_partitions = cached_partitions
+        self._cache: 'OrderedDict[str, Tuple[Hashable, List[Dict[str, Any]]]]' = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def partition_key(self, order: Dict[str, Any]) -> str:
+        """'2024-10' (or '2024-10-24' for daily partitions) from the order timestamp"""
+        return order['timestamp'][:self.key_length]
+
+    def partitions(self) -> List[Tuple[str, str]]:
+        """(key, path) of every partition, oldest first"""
+        if not os.path.isdir(self.archive_dir):
+            return []
+        found = []
+        for name in os.listdir(self.archive_dir):
+            match = _PARTITION.match(name)
+            if match:
+                found.append((match.group(1), os.path.join(self.archive_dir, name)))
+        return sorted(found)
+
+    def add(self, orders: List[Dict[str, Any]]) -> None:
+        """Merge orders into their partitions, orders already archived are skipped
+
+        Skipping known ids makes a rollover that crashed halfway safe to run
+        again.
+        """
+        by_key: Dict[str, List[Dict[str, Any]]] = {}
+        for order in orders:
+            by_key.setdefault(self.partition_key(order), []).append(order)
+
+        os.makedirs(self.archive_dir, exist_ok=True)
+        existing = dict(self.partitions())
+        for key, new_orders in sorted(by_key.items()):
+            path = existing.get(key) or os.path.join(
+                self.archive_dir, f"orders-{key}{EXTENSIONS[self.compression]}")
+            with file_lock(path + '.lock'):
+                current = self._read_partition(path) if os.path.exists(path) else []
+                known = {order['id'] for order in current}
+                merged = current + [order for order in new_orders if order['id'] not in known]
+                merged.sort(key=lambda order: order['timestamp'])
+                self._write_partition(path, merged)
+
+    def read(self, since: Optional[str] = None, until: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """Archived orders from the partitions overlapping [since, until)
+
+        Partitions are pruned by name only, callers still filter the orders.
+        """
+        for key, path in self.partitions():
+            if since is not None and key < since[:len(key)]:
+                continue
+            if until is not None and key > until[:len(key)]:
+                continue
+            yield from self._cached_partition(path)
+
+    def _cached_partition(self, path: str) -> List[Dict[str, Any]]:
+        st = os.stat(path)
+        version = (st.st_ino, st.st_mtime_ns, st.st_size)
+        with self._cache_lock:
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == version:
+                self._cache.move_to_end(path)
+                metrics.cache_lookup('archive', True)
+                return cached[1]
+        metrics.cache_lookup('archive', False)
+        orders = self._read_partition(path)
+        with self._cache_lock:
+            self._cache[path] = (version, orders)
+            while len(self._cache) > self.cached_partitions:
+                self._cache.popitem(last=False)
+        return orders
+
+    def _open(self, path: str, mode: str) -> IO[bytes]:
+        if path.endswith('.zst'):
+            if zstandard is None:
+                raise ValueError(f"{path} is zstd compressed, install the zstandard package to read it")
+            raw = open(path, mode)
+            if mode == 'rb':
+                return zstandard.ZstdDecompressor().stream_reader(raw, closefd=True)
+            return zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=True)
+        return gzip.open(path, mode, compresslevel=6) if mode == 'wb' else gzip.open(path, mode)
+
+    def _read_partition(self, path: str) -> List[Dict[str, Any]]:
+        metrics.add_bytes('read', 'archive', os.path.getsize(path))
+        with self._open(path, 'rb') as raw, io.TextIOWrapper(raw, encoding='utf-8') as f:
+            return [json.loads(line) for line in f if line.strip()]
+
+    def _write_partition(self, path: str, orders: List[Dict[str, Any]]) -> None:
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with self._open(tmp_path, 'wb') as f:
+            for order in orders:
+                f.write((json.dumps(order, separators=(',', ':')) + '\n').encode('utf-8'))
+        with open(tmp_path, 'rb') as f:
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        metrics.add_bytes('write', 'archive', os.path.getsize(path))
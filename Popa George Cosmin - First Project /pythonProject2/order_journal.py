@@ -0,0 +1,182 @@
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Tuple
+
+import metrics
+from fileutil import atomic_write, file_lock, file_version
+
+
+class OrderJournal:
+    """Append-only order log with a compacted JSON snapshot
+
+    New orders are appended as single JSON lines to the journal, so placing an
+    order costs one small write no matter how many orders exist. Status changes
+    are journaled the same way, as ``{"status_update": {"id": ..., "status": ...}}``
+    lines. Every so often the journal is folded into the snapshot (the plain
+    JSON array the app has always used) and truncated; that happens outside
+    ``append`` (see ``needs_compaction``), so an append never waits for it.
+    """
+
+    def __init__(self,
+                 snapshot_path: str = 'data/orders.json',
+                 journal_path: str = 'data/orders.jsonl',
+                 fsync_every: int = 8,
+                 fsync_interval: float = 1.0,
+                 compact_bytes: int = 1024 * 1024) -> None:
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path
+        self.lock_path = journal_path + '.lock'
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.compact_bytes = compact_bytes
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+        self._sync_lock = threading.Lock()
+
+    def append(self, order: Dict[str, Any]) -> Tuple[Hashable, Hashable]:
+        """Append one order to the journal"""
+        return self._append_records([order])
+
+    def append_many(self, orders: List[Dict[str, Any]]) -> Tuple[Hashable, Hashable]:
+        """Append a batch of orders with a single write"""
+        return self._append_records(orders)
+
+    def append_status(self, order_id: str, status: str) -> Tuple[Hashable, Hashable]:
+        """Record a status change for an order already in the journal or snapshot"""
+        return self.append_statuses([(order_id, status)])
+
+    def append_statuses(self, updates: List[Tuple[str, str]]) -> Tuple[Hashable, Hashable]:
+        """Record a batch of (order id, status) changes with a single write"""
+        return self._append_records([{'status_update': {'id': order_id, 'status': status}}
+                                     for order_id, status in updates])
+
+    def version(self) -> Hashable:
+        """Token that changes whenever an order is appended, compacted or rolled over"""
+        return file_version(self.journal_path), file_version(self.snapshot_path)
+
+    def _append_records(self, records: List[Dict[str, Any]]) -> Tuple[Hashable, Hashable]:
+        # Returns the versions just before and after this write, both read
+        # under the lock so no other writer can come in between
+        data = ''.join(json.dumps(record, separators=(',', ':')) + '\n' for record in records).encode('utf-8')
+        metrics.add_bytes('write', os.path.basename(self.journal_path), len(data))
+        with file_lock(self.lock_path):
+            before = self.version()
+            fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, data)
+                self._maybe_fsync(fd, len(records))
+            finally:
+                os.close(fd)
+            return before, self.version()
+
+    def _maybe_fsync(self, fd: int, count: int) -> None:
+        # Batch fsyncs: an OS crash can lose at most the last few unsynced
+        # orders, a process crash loses nothing that was written.
+        with self._sync_lock:
+            self._unsynced += count
+            now = time.monotonic()
+            if self._unsynced < self.fsync_every and now - self._last_sync < self.fsync_interval:
+                return
+            self._unsynced = 0
+            self._last_sync = now
+        os.fsync(fd)
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Return the snapshot followed by every journaled order"""
+        with file_lock(self.lock_path, exclusive=False):
+            return self._fold(self._read_snapshot(), self._read_journal())
+
+    def needs_compaction(self) -> bool:
+        """True once the journal outgrows compact_bytes and half the snapshot
+
+        Scaling with the snapshot means each rewrite of the snapshot is paid
+        for by at least half its size in new journal bytes, so the amortized
+        cost per order stays constant however long the history is.
+        """
+        try:
+            journal_size = os.path.getsize(self.journal_path)
+        except FileNotFoundError:
+            return False
+        try:
+            snapshot_size = os.path.getsize(self.snapshot_path)
+        except FileNotFoundError:
+            snapshot_size = 0
+        return journal_size >= max(self.compact_bytes, snapshot_size // 2)
+
+    def compact(self) -> None:
+        """Fold the journal into the snapshot and truncate the journal"""
+        with file_lock(self.lock_path):
+            pending = self._read_journal()
+            if not pending:
+                return
+            self._write_snapshot(self._fold(self._read_snapshot(), pending))
+            os.truncate(self.journal_path, 0)
+
+    def roll_over(self,
+                  is_old: Callable[[Dict[str, Any]], bool],
+                  archive: Callable[[List[Dict[str, Any]]], None]) -> int:
+        """Hand the orders matching ``is_old`` to ``archive`` and drop them here
+
+        Runs under the journal lock, the snapshot is only rewritten after
+        ``archive`` returned, so a crash in between keeps every order.
+        """
+        with file_lock(self.lock_path):
+            orders = self._fold(self._read_snapshot(), self._read_journal())
+            old = [order for order in orders if is_old(order)]
+            if not old:
+                return 0
+            archive(old)
+            self._write_snapshot([order for order in orders if not is_old(order)])
+            if os.path.exists(self.journal_path):
+                os.truncate(self.journal_path, 0)
+            return len(old)
+
+    def _write_snapshot(self, orders: List[Dict[str, Any]]) -> None:
+        atomic_write(self.snapshot_path, json.dumps(orders))
+
+    def _fold(self, orders: List[Dict[str, Any]], records: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        # Orders from before ids existed use their timestamp as id. An order
+        # appended twice (a retried batch) is kept once, the first copy wins.
+        by_id: Dict[str, Dict[str, Any]] = {}
+        folded = []
+        for order in orders:
+            order_id = order.setdefault('id', order['timestamp'])
+            if order_id not in by_id:
+                by_id[order_id] = order
+                folded.append(order)
+        for record in records:
+            update = record.get('status_update')
+            if update is None:
+                order_id = record.setdefault('id', record['timestamp'])
+                if order_id not in by_id:
+                    by_id[order_id] = record
+                    folded.append(record)
+            elif update['id'] in by_id:
+                by_id[update['id']]['status'] = update['status']
+        return folded
+
+    def _read_snapshot(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.snapshot_path):
+            return []
+        with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+            data = f.read()
+        metrics.add_bytes('read', os.path.basename(self.snapshot_path), len(data))
+        return json.loads(data)
+
+    def _read_journal(self) -> List[Dict[str, Any]]:
+        if not os.path.exists(self.journal_path):
+            return []
+        orders = []
+        metrics.add_bytes('read', os.path.basename(self.journal_path), os.path.getsize(self.journal_path))
+        with open(self.journal_path, 'r', encoding='utf-8') as f:
+            for line in f:
+                # A torn final line (crash mid-write) has no newline, skip it
+                if not line.endswith('\n') or not line.strip():
+                    continue
+                try:
+                    orders.append(json.loads(line))
+                except ValueError:
+                    continue
+        return orders
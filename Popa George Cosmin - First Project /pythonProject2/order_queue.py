@@ -0,0 +1,210 @@
+import json
+import os
+import queue
+import threading
+import time
+import uuid
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from fileutil import try_lock
+from storage import Storage, new_order_id
+
+# (kind, payload, time.monotonic() when it was queued), kind is 'order' or 'status'
+QueueEntry = Tuple[str, Dict[str, Any], float]
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class OrderQueue:
+    """Accepts orders from the UI and persists them from a background thread
+
+    ``submit`` only appends the order to this process's spool file and fsyncs
+    it, so the customer gets a confirmation as soon as the order is durable.
+    The worker thread drains the queue in batches into storage. Spool files
+    left behind by a process that died are replayed on startup, skipping
+    orders that had already reached storage.
+    """
+
+    def __init__(self,
+                 storage: Storage,
+                 spool_dir: str = 'data/queue',
+                 batch_size: int = 100,
+                 on_persisted: Optional[Callable[[List[Dict[str, Any]]], None]] = None) -> None:
+        self.storage = storage
+        self.spool_dir = spool_dir
+        self.batch_size = batch_size
+        self.on_persisted = on_persisted
+
+        self._queue: 'queue.Queue[QueueEntry]' = queue.Queue()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._persisted = 0
+        self._failures = 0
+        self._callback_failures = 0
+        self._maintenance_failures = 0
+        self._latencies: Deque[float] = deque(maxlen=1000)
+
+        os.makedirs(spool_dir, exist_ok=True)
+        self._recover()
+
+        self.spool_path = os.path.join(spool_dir, f'spool-{os.getpid()}-{uuid.uuid4().hex[:8]}.jsonl')
+        # Held for the life of the process, tells other processes the spool is live
+        self._spool_owner_fd = try_lock(self.spool_path)
+
+        self._worker = threading.Thread(target=self._run, name='order-queue', daemon=True)
+        self._worker.start()
+
+    def submit(self, order: Dict[str, Any]) -> str:
+        """Durably queue a new order and return its id"""
+        order['id'] = new_order_id()
+        self._enqueue('order', order)
+        return order['id']
+
+    def update_status(self, order_id: str, status: str) -> None:
+        """Queue a status change, applied after any queued order with that id"""
+        self._enqueue('status', {'id': order_id, 'status': status})
+
+    def _enqueue(self, kind: str, payload: Dict[str, Any]) -> None:
+        key = 'order' if kind == 'order' else 'status_update'
+        line = (json.dumps({key: payload}, separators=(',', ':')) + '\n').encode('utf-8')
+        with self._lock:
+            fd = os.open(self.spool_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                os.write(fd, line)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            self._queue.put((kind, payload, time.monotonic()))
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, throughput and end-to-end latency of recent orders"""
+        latencies = list(self._latencies)
+        return {
+            'queue_depth': self._queue.qsize() + self._in_flight,
+            'persisted': self._persisted,
+            'failures': self._failures,
+            'callback_failures': self._callback_failures,
+            'maintenance_failures': self._maintenance_failures,
+            'worker_alive': self._worker.is_alive(),
+            'latency_p50_ms': percentile(latencies, 0.50) * 1000,
+            'latency_p99_ms': percentile(latencies, 0.99) * 1000,
+        }
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            with self._lock:
+                self._in_flight = len(batch)
+
+            self._persist(batch)
+            try:
+                self.storage.maintain()
+            except Exception:
+                # Only moves data that is already stored, retried after the next batch
+                self._maintenance_failures += 1
+
+            with self._lock:
+                self._in_flight = 0
+                # Everything spooled so far is in storage, start the spool over
+                if self._queue.empty():
+                    try:
+                        os.truncate(self.spool_path, 0)
+                    except OSError:
+                        pass  # Replayed orders are skipped by id, a longer spool is harmless
+
+    def _persist(self, batch: List[QueueEntry]) -> None:
+        entries = [(kind, payload) for kind, payload, _ in batch]
+        delay = 0.1
+        while True:
+            try:
+                self._apply(entries)
+                break
+            except Exception:
+                # Storage is unavailable or failed halfway through the batch. The
+                # spool still has the batch, so keep retrying; whatever this worker
+                # dies of would otherwise leave orders confirmed but never stored.
+                self._failures += 1
+                time.sleep(delay)
+                delay = min(delay * 2, 5.0)
+                try:
+                    entries = self._unsaved(entries)
+                except Exception:
+                    pass  # Storage is still down, retry the whole batch next time
+
+        now = time.monotonic()
+        for kind, _, queued_at in batch:
+            if kind == 'order':
+                self._persisted += 1
+                self._latencies.append(now - queued_at)
+
+    def _unsaved(self, entries: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+        # Orders saved before a failed attempt must not be saved a second time
+        stored = self.storage.existing_order_ids(
+            payload['id'] for kind, payload in entries if kind == 'order')
+        return [(kind, payload) for kind, payload in entries if kind != 'order' or payload['id'] not in stored]
+
+    def _apply(self, entries: List[Tuple[str, Dict[str, Any]]]) -> None:
+        # Keep submission order: save the run of orders before each status change
+        orders: List[Dict[str, Any]] = []
+        for kind, payload in entries:
+            if kind == 'order':
+                orders.append(payload)
+                continue
+            self._save(orders)
+            orders = []
+            self.storage.update_order_status(payload['id'], payload['status'])
+        self._save(orders)
+
+    def _save(self, orders: List[Dict[str, Any]]) -> None:
+        if not orders:
+            return
+        self.storage.save_orders(orders)
+        if self.on_persisted is not None:
+            try:
+                self.on_persisted(orders)
+            except Exception:
+                # Only derived data (e.g. analytics) lives here, it can be rebuilt,
+                # and it must never stop or repeat saving the orders themselves
+                self._callback_failures += 1
+
+    def _recover(self) -> None:
+        for name in sorted(os.listdir(self.spool_dir)):
+            path = os.path.join(self.spool_dir, name)
+            if not name.startswith('spool-'):
+                continue
+            owner_fd = try_lock(path)
+            if owner_fd is None:
+                continue  # Another live process owns this spool
+            try:
+                entries = self._read_spool(path)
+                self._apply(self._unsaved(entries))
+            finally:
+                os.close(owner_fd)
+            os.remove(path)
+
+    def _read_spool(self, path: str) -> List[Tuple[str, Dict[str, Any]]]:
+        entries = []
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                if not line.endswith('\n'):
+                    continue  # Torn write, that order was never confirmed
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if 'order' in record:
+                    entries.append(('order', record['order']))
+                else:
+                    entries.append(('status', record['status_update']))
+        return entries
@@ -0,0 +1,102 @@
+import threading
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+PENDING = 'pending'
+PREPARING = 'preparing'
+OUT_FOR_DELIVERY = 'out for delivery'
+DELIVERED = 'delivered'
+CANCELLED = 'cancelled'
+
+ORDER_STATUSES = (PENDING, PREPARING, OUT_FOR_DELIVERY, DELIVERED, CANCELLED)
+# Statuses the kitchen and dispatch still have to act on
+OPEN_STATUSES = (PENDING, PREPARING, OUT_FOR_DELIVERY)
+CLOSED_STATUSES = (DELIVERED, CANCELLED)
+
+TRANSITIONS: Dict[str, Tuple[str, ...]] = {
+    PENDING: (PREPARING, CANCELLED),
+    PREPARING: (OUT_FOR_DELIVERY, CANCELLED),
+    OUT_FOR_DELIVERY: (DELIVERED, CANCELLED),
+    DELIVERED: (),
+    CANCELLED: (),
+}
+
+
+class InvalidTransition(ValueError):
+    """A status change the workflow does not allow"""
+
+
+def check_transition(current: str, new: str) -> None:
+    if new not in TRANSITIONS.get(current, ()):
+        raise InvalidTransition(f"An order cannot go from '{current}' to '{new}'")
+
+
+class OrderBoard:
+    """Open orders indexed by status, for the kitchen and dispatch screens
+
+    Only open orders are held, each status keeps its orders in the order they
+    reached it, so every read is O(open orders) however long the order
+    history is. Closed orders leave the board.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._by_status: Dict[str, Dict[str, Dict[str, Any]]] = {status: {} for status in OPEN_STATUSES}
+        self._status_of: Dict[str, str] = {}
+
+    def load(self, orders: Iterable[Mapping[str, Any]]) -> None:
+        """Add open orders read from storage, in any order"""
+        with self._lock:
+            for order in sorted(orders, key=lambda order: order['timestamp']):
+                self._put(dict(order))
+
+    def replace(self, orders: Iterable[Mapping[str, Any]]) -> None:
+        """Swap the board for the open orders currently in storage"""
+        with self._lock:
+            self._by_status = {status: {} for status in OPEN_STATUSES}
+            self._status_of = {}
+            for order in sorted(orders, key=lambda order: order['timestamp']):
+                self._put(dict(order))
+
+    def add(self, order: Mapping[str, Any]) -> None:
+        with self._lock:
+            self._put(dict(order))
+
+    def _put(self, order: Dict[str, Any]) -> None:
+        status = order['status']
+        if status in self._by_status and order['id'] not in self._status_of:
+            self._by_status[status][order['id']] = order
+            self._status_of[order['id']] = status
+
+    def get(self, order_id: str) -> Optional[Dict[str, Any]]:
+        """Copy of an open order, None once it is closed or unknown"""
+        with self._lock:
+            status = self._status_of.get(order_id)
+            return dict(self._by_status[status][order_id]) if status is not None else None
+
+    def status_of(self, order_id: str) -> Optional[str]:
+        """Status of an open order, None once it is closed or unknown"""
+        return self._status_of.get(order_id)
+
+    def transition(self, order_id: str, new_status: str) -> None:
+        """Move an open order to ``new_status``, raises InvalidTransition"""
+        with self._lock:
+            current = self._status_of.get(order_id)
+            if current is None:
+                raise InvalidTransition(f"Order {order_id} is not open")
+            check_transition(current, new_status)
+            order = self._by_status[current].pop(order_id)
+            order['status'] = new_status
+            if new_status in self._by_status:
+                self._by_status[new_status][order_id] = order
+                self._status_of[order_id] = new_status
+            else:
+                del self._status_of[order_id]
+
+    def orders(self, status: str) -> List[Dict[str, Any]]:
+        """Open orders with ``status``, longest waiting first"""
+        with self._lock:
+            return list(self._by_status[status].values())
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {status: len(orders) for status, orders in self._by_status.items()}
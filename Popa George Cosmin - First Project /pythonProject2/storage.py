@@ -0,0 +1,695 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from datetime import date, datetime
+from types import MappingProxyType
+from typing import Any, Callable, Dict, Hashable, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+import metrics
+from fileutil import atomic_write, file_lock, file_version
+from menu import MenuIndex, assign_ids
+from order_archive import OrderArchive
+from order_journal import OrderJournal
+from order_status import CLOSED_STATUSES, DELIVERED, OPEN_STATUSES, PENDING
+
+
+class StorageError(IOError):
+    """Raised by storage backends so callers only need to handle IOError"""
+
+
+Menu = Tuple[Mapping[str, Any], ...]
+
+
+def new_order_id() -> str:
+    return uuid.uuid4().hex[:12]
+
+
+class Storage:
+    """Interface shared by the storage backends
+
+    Backends implement ``_read_menu``/``_write_menu``/``menu_version`` and the
+    matching user methods, the parsed menu and users are cached here and
+    shared by every session of the process.
+    """
+
+    def __init__(self) -> None:
+        self._menu_cache: Optional[Tuple[Hashable, Menu, MenuIndex]] = None
+        self._users_cache: Optional[Tuple[Hashable, Mapping[str, str]]] = None
+        # Versions last seen by a ChangeFeed, when set the caches trust them
+        # instead of asking the backend on every read
+        self._known_versions: Optional[Dict[str, Hashable]] = None
+        # Orders version before -> after each write made by this process
+        self._own_order_writes: 'OrderedDict[Hashable, Hashable]' = OrderedDict()
+        self._own_order_writes_lock = threading.Lock()
+
+    def versions(self) -> Dict[str, Hashable]:
+        """Current version token of the menu, the users and the orders"""
+        return {'menu': self.menu_version(), 'users': self.users_version(), 'orders': self.orders_version()}
+
+    def set_known_versions(self, versions: Optional[Mapping[str, Hashable]]) -> None:
+        """Versions the caches may trust until the next call, None to check every read"""
+        self._known_versions = dict(versions) if versions is not None else None
+
+    def _record_own_write(self, before: Hashable, after: Hashable) -> None:
+        with self._own_order_writes_lock:
+            self._own_order_writes[before] = after
+            if len(self._own_order_writes) > 1000:
+                self._own_order_writes.popitem(last=False)
+
+    def changed_elsewhere(self, old: Hashable, new: Hashable) -> bool:
+        """False if every orders change from version ``old`` to ``new`` came from this process"""
+        with self._own_order_writes_lock:
+            version = old
+            for _ in range(len(self._own_order_writes) + 1):
+                if version == new:
+                    return False
+                version = self._own_order_writes.get(version)
+                if version is None:
+                    break
+            return True
+
+    def _current_version(self, name: str, read_version: Callable[[], Hashable]) -> Hashable:
+        known = self._known_versions
+        return known[name] if known is not None else read_version()
+
+    def _cached_menu(self) -> Tuple[Menu, MenuIndex]:
+        version = self._current_version('menu', self.menu_version)
+        cache = self._menu_cache
+        hit = cache is not None and cache[0] == version
+        metrics.cache_lookup('menu', hit)
+        if hit:
+            return cache[1], cache[2]
+        items = self._read_menu()
+        assign_ids(items)
+        menu = tuple(MappingProxyType(item) for item in items)
+        index = MenuIndex(menu)
+        self._menu_cache = (version, menu, index)
+        return menu, index
+
+    def load_menu(self) -> Menu:
+        """Read-only menu, parsed again only when its version changes"""
+        return self._cached_menu()[0]
+
+    def menu_index(self) -> MenuIndex:
+        """Id and category index over the cached menu"""
+        return self._cached_menu()[1]
+
+    def save_menu(self, menu_items: Sequence[Mapping[str, Any]]) -> None:
+        items = [dict(item) for item in menu_items]
+        assign_ids(items)
+        self._write_menu(items)
+        self._menu_cache = None
+
+    def menu_version(self) -> Hashable:
+        """Cheap token that changes whenever the stored menu changes"""
+        raise NotImplementedError
+
+    def _read_menu(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def _write_menu(self, menu_items: List[Dict[str, Any]]) -> None:
+        raise NotImplementedError
+
+    def save_order(self, order: Dict[str, Any]) -> None:
+        self.save_orders([order])
+
+    def save_orders(self, orders: List[Dict[str, Any]]) -> None:
+        """Persist a batch of orders at once, orders without an ``id`` get one"""
+        raise NotImplementedError
+
+    def update_order_status(self, order_id: str, status: str) -> None:
+        raise NotImplementedError
+
+    def maintain(self) -> None:
+        """Housekeeping kept off the write path, called by the order queue after saving"""
+
+    def close_legacy_orders(self, before: str) -> Optional[int]:
+        """Mark orders still pending from before the status workflow as delivered
+
+        Orders placed before the workflow existed were all saved as pending.
+        Runs once per data store, in one write: returns how many orders were
+        closed, or None if an earlier run already did it.
+        """
+        raise NotImplementedError
+
+    def existing_order_ids(self, order_ids: Iterable[str]) -> Set[str]:
+        """The subset of ``order_ids`` that is already stored"""
+        raise NotImplementedError
+
+    def get_orders(self) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def orders_version(self) -> Hashable:
+        """Cheap token that changes whenever an order is added or updated"""
+        raise NotImplementedError
+
+    def query_orders(self,
+                     status: Optional[str] = None,
+                     since: Optional[str] = None,
+                     until: Optional[str] = None,
+                     search: Optional[str] = None,
+                     limit: Optional[int] = None,
+                     offset: int = 0) -> List[Dict[str, Any]]:
+        """Orders matching the filters, newest first
+
+        ``since``/``until`` are ISO timestamps (``until`` is exclusive) and
+        ``search`` matches the start of the customer name or phone number.
+        """
+        raise NotImplementedError
+
+    def count_orders(self,
+                     status: Optional[str] = None,
+                     since: Optional[str] = None,
+                     until: Optional[str] = None,
+                     search: Optional[str] = None) -> int:
+        """Number of orders matching the same filters as ``query_orders``"""
+        raise NotImplementedError
+
+    def query_page(self,
+                   limit: int,
+                   offset: int = 0,
+                   status: Optional[str] = None,
+                   since: Optional[str] = None,
+                   until: Optional[str] = None,
+                   search: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """One page of ``query_orders`` and the number of matching orders, for paging"""
+        raise NotImplementedError
+
+    def get_users(self) -> Mapping[str, str]:
+        """Read-only username -> password hash table, cached like the menu"""
+        version = self._current_version('users', self.users_version)
+        cache = self._users_cache
+        hit = cache is not None and cache[0] == version
+        metrics.cache_lookup('users', hit)
+        if hit:
+            return cache[1]
+        users = MappingProxyType(self._read_users())
+        self._users_cache = (version, users)
+        return users
+
+    def get_user_hash(self, username: str) -> Optional[str]:
+        return self.get_users().get(username)
+
+    def set_user_hash(self, username: str, password_hash: str) -> None:
+        self._write_user(username, password_hash)
+        self._users_cache = None
+
+    def users_version(self) -> Hashable:
+        """Cheap token that changes whenever the stored users change"""
+        raise NotImplementedError
+
+    def _read_users(self) -> Dict[str, str]:
+        raise NotImplementedError
+
+    def _write_user(self, username: str, password_hash: str) -> None:
+        raise NotImplementedError
+
+
+class JsonStorage(Storage):
+    """The original data/*.json files, with orders kept in an order journal
+
+    Only today's orders and orders that are still open stay in the journal.
+    Once a day closed orders from earlier days move to the compressed
+    partitions of an OrderArchive, so placing an order never parses them.
+    """
+
+    def __init__(self, data_dir: str = 'data') -> None:
+        super().__init__()
+        self.data_dir = data_dir
+        self.menu_path = os.path.join(data_dir, 'menu.json')
+        self.users_path = os.path.join(data_dir, 'users.json')
+        self.journal = OrderJournal(
+            snapshot_path=os.path.join(data_dir, 'orders.json'),
+            journal_path=os.path.join(data_dir, 'orders.jsonl'),
+        )
+        self.archive = OrderArchive(os.path.join(data_dir, 'archive'))
+        self._rolled_over_on: Optional[str] = None
+
+    def _read_json(self, path: str, default: Any) -> Any:
+        if not os.path.exists(path):
+            return default
+        with open(path, 'r', encoding='utf-8') as f:
+            data = f.read()
+        metrics.add_bytes('read', os.path.basename(path), len(data))
+        return json.loads(data)
+
+    def _write_json(self, path: str, value: Any) -> None:
+        # Written to a temporary file and renamed, so readers need no lock
+        data = json.dumps(value, indent=2)
+        atomic_write(path, data)
+        metrics.add_bytes('write', os.path.basename(path), len(data))
+
+    def menu_version(self) -> Hashable:
+        return file_version(self.menu_path)
+
+    def _read_menu(self) -> List[Dict[str, Any]]:
+        return self._read_json(self.menu_path, [])
+
+    def _write_menu(self, menu_items: List[Dict[str, Any]]) -> None:
+        with file_lock(self.menu_path + '.lock'):
+            self._write_json(self.menu_path, menu_items)
+
+    def save_orders(self, orders: List[Dict[str, Any]]) -> None:
+        for order in orders:
+            order.setdefault('id', new_order_id())
+        self._record_own_write(*self.journal.append_many(orders))
+
+    def maintain(self) -> None:
+        # Roll over once a day; a failed rollover is retried on the next call
+        today = date.today().isoformat()
+        if self._rolled_over_on != today:
+            self.roll_over(today)
+            self._rolled_over_on = today
+        if self.journal.needs_compaction():
+            self.journal.compact()
+
+    def roll_over(self, before: Optional[str] = None) -> int:
+        """Archive closed orders placed before ``before`` (default today), returns how many"""
+        cutoff = before or date.today().isoformat()
+        return self.journal.roll_over(
+            lambda order: order['timestamp'] < cutoff and order['status'] in CLOSED_STATUSES,
+            self.archive.add,
+        )
+
+    def update_order_status(self, order_id: str, status: str) -> None:
+        self._record_own_write(*self.journal.append_status(order_id, status))
+
+    def close_legacy_orders(self, before: str) -> Optional[int]:
+        marker = os.path.join(self.data_dir, 'legacy_orders_closed')
+        with file_lock(marker + '.lock'):
+            if os.path.exists(marker):
+                return None
+            # Pending orders are never archived, the journal has all of them
+            legacy = self.query_orders(status=PENDING, until=before)
+            if legacy:
+                self._record_own_write(*self.journal.append_statuses(
+                    [(order['id'], DELIVERED) for order in legacy]))
+            atomic_write(marker, before + '\n')
+        return len(legacy)
+
+    def existing_order_ids(self, order_ids: Iterable[str]) -> Set[str]:
+        # Only asked about recently submitted orders, which are never archived yet
+        wanted = set(order_ids)
+        return {order['id'] for order in self.journal.read_all() if order['id'] in wanted}
+
+    def get_orders(self) -> List[Dict[str, Any]]:
+        return list(self.archive.read()) + self.journal.read_all()
+
+    def orders_version(self) -> Hashable:
+        return self.journal.version()
+
+    def query_orders(self,
+                     status: Optional[str] = None,
+                     since: Optional[str] = None,
+                     until: Optional[str] = None,
+                     search: Optional[str] = None,
+                     limit: Optional[int] = None,
+                     offset: int = 0) -> List[Dict[str, Any]]:
+        orders = self._filter_orders(status, since, until, search)
+        orders.sort(key=lambda order: order['timestamp'], reverse=True)
+        end = None if limit is None else offset + limit
+        return orders[offset:end]
+
+    def count_orders(self,
+                     status: Optional[str] = None,
+                     since: Optional[str] = None,
+                     until: Optional[str] = None,
+                     search: Optional[str] = None) -> int:
+        return len(self._filter_orders(status, since, until, search))
+
+    def query_page(self,
+                   limit: int,
+                   offset: int = 0,
+                   status: Optional[str] = None,
+                   since: Optional[str] = None,
+                   until: Optional[str] = None,
+                   search: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        # One scan for both, the filtering is what costs
+        orders = self._filter_orders(status, since, until, search)
+        orders.sort(key=lambda order: order['timestamp'], reverse=True)
+        return orders[offset:offset + limit], len(orders)
+
+    def _filter_orders(self,
+                       status: Optional[str],
+                       since: Optional[str],
+                       until: Optional[str],
+                       search: Optional[str]) -> List[Dict[str, Any]]:
+        # The JSON files have no indexes, this has to look at every order in
+        # the journal and in the archive partitions overlapping the date range.
+        # Archived orders are all closed, open statuses never need the archive.
+        orders = self.journal.read_all()
+        if status not in OPEN_STATUSES:
+            orders = list(self.archive.read(since, until)) + orders
+        prefix = search.casefold() if search else None
+        return [
+            order for order in orders
+            if (status is None or order['status'] == status)
+            and (since is None or order['timestamp'] >= since)
+            and (until is None or order['timestamp'] < until)
+            and (prefix is None
+                 or order['customer'].casefold().startswith(prefix)
+                 or order['phone'].startswith(search))
+        ]
+
+    def users_version(self) -> Hashable:
+        return file_version(self.users_path)
+
+    def _read_users(self) -> Dict[str, str]:
+        return self._read_json(self.users_path, {})
+
+    def _write_user(self, username: str, password_hash: str) -> None:
+        # Read-modify-write, other processes must not slip a change in between
+        with file_lock(self.users_path + '.lock'):
+            users = self._read_users()
+            users[username] = password_hash
+            self._write_json(self.users_path, users)
+
+
+class SqliteStorage(Storage):
+    """Embedded SQLite database in WAL mode with indexed order columns"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS menu (
+            position INTEGER PRIMARY KEY,
+            data TEXT NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS orders (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            order_id TEXT,
+            timestamp TEXT NOT NULL,
+            status TEXT NOT NULL,
+            customer TEXT NOT NULL,
+            phone TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_orders_timestamp ON orders (timestamp);
+        CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status, timestamp);
+        CREATE INDEX IF NOT EXISTS idx_orders_customer ON orders (customer COLLATE NOCASE);
+        CREATE INDEX IF NOT EXISTS idx_orders_phone ON orders (phone COLLATE NOCASE);
+        CREATE TABLE IF NOT EXISTS users (
+            username TEXT PRIMARY KEY,
+            password_hash TEXT NOT NULL
+        );
+    """
+
+    def __init__(self, db_path: str = 'data/restaurant.db') -> None:
+        super().__init__()
+        self.db_path = db_path
+        # sqlite3 connections may not be shared between threads, and
+        # Streamlit runs each session in its own thread
+        self._local = threading.local()
+        with self._reading() as conn:
+            conn.executescript(self.SCHEMA)
+        self._upgrade_schema()
+
+    def _upgrade_schema(self) -> None:
+        with self._transaction() as conn:
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(orders)')}
+            if 'order_id' not in columns:
+                # Databases created before orders had ids, use the timestamp like JsonStorage
+                conn.execute('ALTER TABLE orders ADD COLUMN order_id TEXT')
+                conn.execute('UPDATE orders SET order_id = timestamp, '
+                             "data = json_set(data, '$.id', timestamp)")
+            conn.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_order_id ON orders (order_id)')
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        try:
+            conn = self._connect()
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                yield conn
+            except BaseException:
+                conn.execute('ROLLBACK')
+                raise
+            conn.execute('COMMIT')
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+
+    @contextmanager
+    def _reading(self) -> Iterator[sqlite3.Connection]:
+        try:
+            yield self._connect()
+        except sqlite3.Error as e:
+            raise StorageError(str(e)) from e
+
+    def _version(self, key: str) -> Hashable:
+        with self._reading() as conn:
+            row = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def _bump_version(self, conn: sqlite3.Connection, key: str) -> Tuple[Hashable, Hashable]:
+        # Returns the version before and after, inside the caller's transaction
+        before = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        conn.execute(
+            "INSERT INTO meta (key, value) VALUES (?, '1') "
+            "ON CONFLICT (key) DO UPDATE SET value = CAST(value AS INTEGER) + 1",
+            (key,)
+        )
+        after = conn.execute('SELECT value FROM meta WHERE key = ?', (key,)).fetchone()
+        return (before[0] if before else None), after[0]
+
+    def _decode(self, rows: List[Tuple[str]], table: str) -> List[Dict[str, Any]]:
+        if metrics.ENABLED:
+            metrics.add_bytes('read', table, sum(len(row[0]) for row in rows))
+        return [json.loads(row[0]) for row in rows]
+
+    def versions(self) -> Dict[str, Hashable]:
+        # One query instead of one per version
+        with self._reading() as conn:
+            rows = dict(conn.execute(
+                "SELECT key, value FROM meta WHERE key IN ('menu_version', 'users_version', 'orders_version')"
+            ).fetchall())
+        return {name: rows.get(f'{name}_version') for name in ('menu', 'users', 'orders')}
+
+    def menu_version(self) -> Hashable:
+        return self._version('menu_version')
+
+    def _read_menu(self) -> List[Dict[str, Any]]:
+        with self._reading() as conn:
+            rows = conn.execute('SELECT data FROM menu ORDER BY position').fetchall()
+        return self._decode(rows, 'menu')
+
+    def _replace_menu(self, conn: sqlite3.Connection, menu_items: List[Dict[str, Any]]) -> None:
+        rows = [(position, json.dumps(item)) for position, item in enumerate(menu_items)]
+        if metrics.ENABLED:
+            metrics.add_bytes('write', 'menu', sum(len(row[1]) for row in rows))
+        conn.execute('DELETE FROM menu')
+        conn.executemany('INSERT INTO menu (position, data) VALUES (?, ?)', rows)
+        self._bump_version(conn, 'menu_version')
+
+    def _write_menu(self, menu_items: List[Dict[str, Any]]) -> None:
+        with self._transaction() as conn:
+            self._replace_menu(conn, menu_items)
+
+    def _insert_orders(self, conn: sqlite3.Connection, orders: List[Dict[str, Any]]) -> Tuple[Hashable, Hashable]:
+        for order in orders:
+            order.setdefault('id', new_order_id())
+        rows = [(order['id'], order['timestamp'], order['status'], order['customer'], order['phone'],
+                 json.dumps(order))
+                for order in orders]
+        if metrics.ENABLED:
+            metrics.add_bytes('write', 'orders', sum(len(row[5]) for row in rows))
+        conn.executemany(
+            'INSERT INTO orders (order_id, timestamp, status, customer, phone, data) VALUES (?, ?, ?, ?, ?, ?)',
+            rows
+        )
+        return self._bump_version(conn, 'orders_version')
+
+    def save_orders(self, orders: List[Dict[str, Any]]) -> None:
+        with self._transaction() as conn:
+            versions = self._insert_orders(conn, orders)
+        # Only once committed, a rolled back version number gets reused
+        self._record_own_write(*versions)
+
+    def update_order_status(self, order_id: str, status: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                "UPDATE orders SET status = ?, data = json_set(data, '$.status', ?) WHERE order_id = ?",
+                (status, status, order_id)
+            )
+            versions = self._bump_version(conn, 'orders_version')
+        self._record_own_write(*versions)
+
+    def close_legacy_orders(self, before: str) -> Optional[int]:
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'legacy_orders_closed'").fetchone():
+                return None
+            closed = conn.execute(
+                "UPDATE orders SET status = ?, data = json_set(data, '$.status', ?) "
+                "WHERE status = ? AND timestamp < ?",
+                (DELIVERED, DELIVERED, PENDING, before)
+            ).rowcount
+            versions = self._bump_version(conn, 'orders_version') if closed else None
+            conn.execute("INSERT INTO meta (key, value) VALUES ('legacy_orders_closed', ?)", (before,))
+        if versions is not None:
+            self._record_own_write(*versions)
+        return closed
+
+    def existing_order_ids(self, order_ids: Iterable[str]) -> Set[str]:
+        wanted = list(order_ids)
+        found: Set[str] = set()
+        with self._reading() as conn:
+            # Stay well under SQLite's bound parameter limit
+            for start in range(0, len(wanted), 500):
+                chunk = wanted[start:start + 500]
+                placeholders = ', '.join('?' * len(chunk))
+                found.update(row[0] for row in conn.execute(
+                    f'SELECT order_id FROM orders WHERE order_id IN ({placeholders})', chunk))
+        return found
+
+    def get_orders(self) -> List[Dict[str, Any]]:
+        with self._reading() as conn:
+            rows = conn.execute('SELECT data FROM orders ORDER BY id').fetchall()
+        return self._decode(rows, 'orders')
+
+    def orders_version(self) -> Hashable:
+        return self._version('orders_version')
+
+    def query_orders(self,
+                     status: Optional[str] = None,
+                     since: Optional[str] = None,
+                     until: Optional[str] = None,
+                     search: Optional[str] = None,
+                     limit: Optional[int] = None,
+                     offset: int = 0) -> List[Dict[str, Any]]:
+        where, params = self._where(status, since, until, search)
+        sql = 'SELECT data FROM orders' + where + ' ORDER BY timestamp DESC LIMIT ? OFFSET ?'
+        params += [-1 if limit is None else limit, offset]
+        with self._reading() as conn:
+            rows = conn.execute(sql, params).fetchall()
+        return self._decode(rows, 'orders')
+
+    def count_orders(self,
+                     status: Optional[str] = None,
+                     since: Optional[str] = None,
+                     until: Optional[str] = None,
+                     search: Optional[str] = None) -> int:
+        where, params = self._where(status, since, until, search)
+        with self._reading() as conn:
+            return conn.execute('SELECT COUNT(*) FROM orders' + where, params).fetchone()[0]
+
+    def query_page(self,
+                   limit: int,
+                   offset: int = 0,
+                   status: Optional[str] = None,
+                   since: Optional[str] = None,
+                   until: Optional[str] = None,
+                   search: Optional[str] = None) -> Tuple[List[Dict[str, Any]], int]:
+        # Both answered from the indexes, in one read transaction so they agree
+        where, params = self._where(status, since, until, search)
+        with self._reading() as conn:
+            conn.execute('BEGIN')
+            try:
+                total = conn.execute('SELECT COUNT(*) FROM orders' + where, params).fetchone()[0]
+                rows = conn.execute('SELECT data FROM orders' + where + ' ORDER BY timestamp DESC LIMIT ? OFFSET ?',
+                                    params + [limit, offset]).fetchall()
+            finally:
+                conn.execute('COMMIT')
+        return self._decode(rows, 'orders'), total
+
+    def _where(self,
+               status: Optional[str],
+               since: Optional[str],
+               until: Optional[str],
+               search: Optional[str]) -> Tuple[str, List[Any]]:
+        clauses = []
+        params: List[Any] = []
+        if status is not None:
+            clauses.append('status = ?')
+            params.append(status)
+        if since is not None:
+            clauses.append('timestamp >= ?')
+            params.append(since)
+        if until is not None:
+            clauses.append('timestamp < ?')
+            params.append(until)
+        if search:
+            # Prefix LIKE on NOCASE columns can be answered from the indexes
+            pattern = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+            clauses.append("(customer LIKE ? ESCAPE '\\' OR phone LIKE ? ESCAPE '\\')")
+            params += [pattern, pattern]
+        return (' WHERE ' + ' AND '.join(clauses)) if clauses else '', params
+
+    def users_version(self) -> Hashable:
+        return self._version('users_version')
+
+    def _read_users(self) -> Dict[str, str]:
+        with self._reading() as conn:
+            return dict(conn.execute('SELECT username, password_hash FROM users').fetchall())
+
+    def _write_user(self, username: str, password_hash: str) -> None:
+        with self._transaction() as conn:
+            conn.execute(
+                'INSERT INTO users (username, password_hash) VALUES (?, ?) '
+                'ON CONFLICT (username) DO UPDATE SET password_hash = excluded.password_hash',
+                (username, password_hash)
+            )
+            self._bump_version(conn, 'users_version')
+
+    def migrate_from(self, source: Storage) -> bool:
+        """Copy everything from another backend once, returns False if already done"""
+        with self._transaction() as conn:
+            if conn.execute("SELECT 1 FROM meta WHERE key = 'migrated'").fetchone():
+                return False
+            self._replace_menu(conn, [dict(item) for item in source.load_menu()])
+            self._insert_orders(conn, source.get_orders())
+            conn.executemany(
+                'INSERT OR REPLACE INTO users (username, password_hash) VALUES (?, ?)',
+                list(source.get_users().items())
+            )
+            self._bump_version(conn, 'users_version')
+            conn.execute("INSERT INTO meta (key, value) VALUES ('migrated', '1')")
+        return True
+
+
+def open_storage(backend: str = 'json', data_dir: str = 'data') -> Storage:
+    """Create the storage backend named by ``backend`` ('json' or 'sqlite')"""
+    if backend == 'json':
+        return JsonStorage(data_dir)
+    if backend == 'sqlite':
+        storage = SqliteStorage(os.path.join(data_dir, 'restaurant.db'))
+        storage.migrate_from(JsonStorage(data_dir))
+        return storage
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+if __name__ == "__main__":
+    # python storage.py migrate -> copy data/*.json into data/restaurant.db
+    # python storage.py archive -> move closed orders from before today into data/archive
+    # python storage.py close-legacy -> once, when deploying the status workflow: mark
+    #     orders still pending from before now as delivered (RESTAURANT_STORAGE picks the backend)
+    if sys.argv[1:] == ['archive']:
+        print(f"Archived {JsonStorage().roll_over()} orders")
+        sys.exit(0)
+    if sys.argv[1:] == ['close-legacy']:
+        closed = open_storage(os.environ.get('RESTAURANT_STORAGE', 'json')).close_legacy_orders(
+            datetime.now().isoformat())
+        print("Legacy orders were already closed" if closed is None else f"Closed {closed} legacy pending orders")
+        sys.exit(0)
+    if sys.argv[1:] != ['migrate']:
+        print("Usage: python storage.py migrate|archive|close-legacy")
+        sys.exit(1)
+    sqlite_storage = SqliteStorage()
+    if sqlite_storage.migrate_from(JsonStorage()):
+        print("Migrated data/*.json into data/restaurant.db")
+    else:
+        print("data/restaurant.db has already been migrated")
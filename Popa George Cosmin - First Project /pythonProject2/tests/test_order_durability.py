@@ -0,0 +1,173 @@
+import multiprocessing
+import os
+import threading
+import time
+from typing import Any, Dict, List
+
+import pytest
+
+from order_archive import OrderArchive
+from order_journal import OrderJournal
+from order_queue import OrderQueue
+from storage import JsonStorage, open_storage
+
+fork = multiprocessing.get_context('fork')
+
+
+def make_order(customer: str, timestamp: str = '2026-10-18T12:00:00', status: str = 'pending') -> Dict[str, Any]:
+    return {
+        'customer': customer,
+        'address': 'Street 1',
+        'phone': '0700000000',
+        'items': [{'item_id': 'item-1', 'quantity': 1, 'price': 5.0}],
+        'total': 5.0,
+        'timestamp': timestamp,
+        'status': status,
+    }
+
+
+def append_orders(snapshot: str, journal: str, writer: int, count: int) -> None:
+    orders = OrderJournal(snapshot, journal, compact_bytes=4096)
+    for i in range(count):
+        order = make_order(f"w{writer}-{i}")
+        order['id'] = f"w{writer}-{i}"
+        orders.append(order)
+        if i % 10 == 0:
+            orders.append_status(order['id'], 'preparing')
+
+
+def compact_until(snapshot: str, journal: str, done: Any) -> None:
+    orders = OrderJournal(snapshot, journal, compact_bytes=4096)
+    while not done.is_set():
+        if orders.needs_compaction():
+            orders.compact()
+        time.sleep(0.001)
+    orders.compact()
+
+
+def test_concurrent_appends_survive_compaction(tmp_path):
+    snapshot, journal = str(tmp_path / 'orders.json'), str(tmp_path / 'orders.jsonl')
+    writers, count = 4, 200
+    done = fork.Event()
+    compactor = fork.Process(target=compact_until, args=(snapshot, journal, done))
+    compactor.start()
+    processes = [fork.Process(target=append_orders, args=(snapshot, journal, writer, count))
+                 for writer in range(writers)]
+    for process in processes:
+        process.start()
+    # Threads of one process share the journal object as well
+    threads = [threading.Thread(target=append_orders, args=(snapshot, journal, writer, count))
+               for writer in range(writers, writers + 2)]
+    for thread in threads:
+        thread.start()
+    for worker in processes + threads:
+        worker.join()
+    done.set()
+    compactor.join()
+    assert compactor.exitcode == 0 and all(process.exitcode == 0 for process in processes)
+
+    orders = OrderJournal(snapshot, journal).read_all()
+    ids = [order['id'] for order in orders]
+    assert len(ids) == len(set(ids)) == (writers + 2) * count
+    assert all(order['status'] == ('preparing' if int(order['id'].split('-')[1]) % 10 == 0 else 'pending')
+               for order in orders)
+    assert os.path.getsize(journal) == 0  # Everything was folded into the snapshot
+
+
+def submit_then_crash(backend: str, data_dir: str, spool_dir: str, count: int) -> None:
+    storage = open_storage(backend, data_dir)
+    submitted = threading.Event()
+    save_orders = storage.save_orders
+
+    def save_then_die(orders: List[Dict[str, Any]]) -> None:
+        # Stores the first batch, then the process dies before the spool is cleared
+        submitted.wait()
+        save_orders(orders)
+        os._exit(1)
+
+    storage.save_orders = save_then_die  # type: ignore[method-assign]
+    queue = OrderQueue(storage, spool_dir=spool_dir)
+    first = queue.submit(make_order('c0'))
+    for i in range(1, count):
+        queue.submit(make_order(f"c{i}"))
+    queue.update_status(first, 'preparing')
+    submitted.set()
+    time.sleep(30)  # The worker exits the process
+
+
+@pytest.mark.parametrize('backend', ['json', 'sqlite'])
+def test_spool_replay_after_crash_stores_each_order_once(tmp_path, backend):
+    data_dir, spool_dir = str(tmp_path / 'data'), str(tmp_path / 'data' / 'queue')
+    os.makedirs(data_dir)
+    count = 50
+    process = fork.Process(target=submit_then_crash, args=(backend, data_dir, spool_dir, count))
+    process.start()
+    process.join(30)
+    assert process.exitcode == 1
+    storage = open_storage(backend, data_dir)
+    assert len(storage.get_orders()) < count  # The crash left orders only in the spool
+
+    queue = OrderQueue(storage, spool_dir=spool_dir)  # Replays dead spools on startup
+
+    orders = storage.get_orders()
+    assert sorted(order['customer'] for order in orders) == sorted(f"c{i}" for i in range(count))
+    assert len({order['id'] for order in orders}) == count
+    assert {order['customer']: order['status'] for order in orders}['c0'] == 'preparing'
+    assert os.listdir(spool_dir) == [os.path.basename(queue.spool_path)]  # The dead spool is gone
+    if backend == 'json':
+        # Reads drop repeated ids, the journal itself must not have them either
+        with open(os.path.join(data_dir, 'orders.jsonl'), 'r', encoding='utf-8') as f:
+            assert sum('status_update' not in line for line in f) == count
+
+
+@pytest.fixture
+def history(tmp_path):
+    storage = JsonStorage(str(tmp_path))
+    storage.save_orders([
+        make_order('september', '2024-09-02T12:00:00', 'delivered'),
+        make_order('october', '2024-10-24T12:00:00', 'cancelled'),
+        make_order('still open', '2024-10-25T12:00:00', 'pending'),
+        make_order('today', '2026-10-18T09:00:00', 'delivered'),
+    ])
+    return storage
+
+
+def customers(storage: JsonStorage) -> List[str]:
+    return sorted(order['customer'] for order in storage.get_orders())
+
+
+def test_rollover_interrupted_while_archiving_can_run_again(history, monkeypatch):
+    write_partition = OrderArchive._write_partition
+    calls = []
+
+    def fail_on_second(self, path, orders):
+        calls.append(path)
+        if len(calls) == 2:
+            raise OSError("disk full")
+        write_partition(self, path, orders)
+
+    monkeypatch.setattr(OrderArchive, '_write_partition', fail_on_second)
+    with pytest.raises(OSError):
+        history.roll_over('2026-10-18')
+    monkeypatch.undo()
+
+    assert history.roll_over('2026-10-18') == 2
+    assert customers(history) == ['october', 'september', 'still open', 'today']
+    assert history.roll_over('2026-10-18') == 0
+    assert customers(history) == ['october', 'september', 'still open', 'today']
+
+
+def test_rollover_interrupted_before_the_snapshot_can_run_again(history, monkeypatch):
+    def crash(self, orders):
+        raise OSError("killed")
+
+    monkeypatch.setattr(OrderJournal, '_write_snapshot', crash)
+    with pytest.raises(OSError):
+        history.roll_over('2026-10-18')
+    monkeypatch.undo()
+
+    assert history.roll_over('2026-10-18') == 2
+    assert customers(history) == ['october', 'september', 'still open', 'today']
+    assert sorted(order['customer'] for order in history.archive.read()) == ['october', 'september']
+    assert history.roll_over('2026-10-18') == 0
+    assert customers(history) == ['october', 'september', 'still open', 'today']
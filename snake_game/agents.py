@@ -0,0 +1,281 @@
+import heapq
+import random
+from collections import deque
+from functools import lru_cache
+
+from engine import DELTAS, OPPOSITE
+
+# Agenții disponibili după nume, folosiți de tournament.py
+AGENTS = {}
+
+
+def register_agent(name):
+    """Decorator: face agentul disponibil în AGENTS (și în turneu) sub `name`"""
+    def register(cls):
+        AGENTS[name] = cls
+        return cls
+    return register
+
+
+def make_agent(name, width, height):
+    if name not in AGENTS:
+        raise ValueError(f"Agent necunoscut: {name} (disponibili: {', '.join(sorted(AGENTS))})")
+    return AGENTS[name](width, height)
+
+
+class Grid:
+    """Vecinii fiecărei celule, calculați o singură dată pentru o tablă
+
+    neighbours[cell] este un tuplu de (direcție, celulă vecină), doar
+    vecinii din interiorul tablei.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.xs = [cell % width for cell in range(self.cells)]
+        self.ys = [cell // width for cell in range(self.cells)]
+        self.neighbours = []
+        for cell in range(self.cells):
+            x, y = self.xs[cell], self.ys[cell]
+            self.neighbours.append(tuple(
+                (direction, (y + dy) * width + x + dx)
+                for direction, (dx, dy) in enumerate(DELTAS)
+                if 0 <= x + dx < width and 0 <= y + dy < height))
+        # direction_to[a][b] pentru celule vecine
+        self.direction_to = [dict((b, d) for d, b in self.neighbours[a]) for a in range(self.cells)]
+
+
+@lru_cache(maxsize=None)
+def get_grid(width, height):
+    return Grid(width, height)
+
+
+class Agent:
+    """Interfața unui jucător automat
+
+    reset() este apelat la începutul fiecărui joc, act() la fiecare tick și
+    returnează o direcție (UP/DOWN/LEFT/RIGHT) sau None pentru a merge
+    înainte. Agentul doar citește starea lui SnakeEngine (body, occupied,
+    apple_cell, direction), nu o modifică.
+    """
+
+    def __init__(self, width, height):
+        self.grid = get_grid(width, height)
+
+    def reset(self, engine):
+        pass
+
+    def act(self, engine):
+        raise NotImplementedError
+
+
+@register_agent('random')
+class RandomAgent(Agent):
+    """Alege la întâmplare dintre mutările care nu lovesc imediat ceva"""
+
+    def __init__(self, width, height):
+        super().__init__(width, height)
+        self.rng = random.Random(0)
+
+    def reset(self, engine):
+        self.rng.seed(engine.seed)
+
+    def act(self, engine):
+        safe = [direction for direction, cell in self.grid.neighbours[engine.body[0]]
+                if not engine.occupied[cell] and direction != OPPOSITE[engine.direction]]
+        return self.rng.choice(safe) if safe else None
+
+
+@register_agent('astar')
+class PathAgent(Agent):
+    """Drumul cel mai scurt până la măr (A* sau BFS), ocolind corpul
+
+    Obstacolele țin cont de timp: celula a i-a de la coadă se eliberează
+    după i + 1 pași, deci drumul poate trece pe unde va fi fost coada. Dacă
+    mărul nu se poate atinge, agentul urmărește coada; altfel face orice
+    mutare sigură.
+
+    Drumul găsit se păstrează și se urmează pas cu pas; se caută din nou
+    doar când apare un măr nou, următoarea celulă nu mai e liberă sau nu mai
+    e vecină cu capul (starea s-a schimbat din afară). Vectorii
+    de lucru (distanțe, părinți) sunt alocați o dată și marcați cu un
+    număr de căutare, nu goliți la fiecare căutare.
+    """
+
+    search = 'astar'
+
+    def __init__(self, width, height):
+        super().__init__(width, height)
+        cells = self.grid.cells
+        self.mark = [0] * cells
+        self.dist = [0] * cells
+        self.parent = [0] * cells
+        self.generation = 0
+        self.path = []  # celulele de urmat, următoarea la final
+        self.target = -1
+
+    def reset(self, engine):
+        self.path = []
+        self.target = -1
+
+    def act(self, engine):
+        head = engine.body[0]
+        path = self.path
+        if path and self.target == engine.apple_cell and not engine.occupied[path[-1]]:
+            # Dacă starea a deviat de la plan (acțiuni din afară, restore/seek),
+            # următoarea celulă nu mai e lângă cap: se caută un drum nou
+            direction = self.grid.direction_to[head].get(path[-1])
+            if direction is not None:
+                path.pop()
+                return direction
+
+        free_at = self._free_times(engine)
+        self.target = engine.apple_cell
+        path = self._find(head, engine.apple_cell, free_at) if engine.apple_cell >= 0 else None
+        if path is None:
+            # Fără drum la măr: spre coadă, recalculat la fiecare pas
+            self.target = -1
+            path = self._find(head, engine.body[-1], free_at)
+        if path:
+            self.path = path
+            return self.grid.direction_to[head][path.pop()]
+        self.path = []
+        for direction, cell in self.grid.neighbours[head]:
+            if not engine.occupied[cell]:
+                return direction
+        return None
+
+    def _free_times(self, engine):
+        # Pasul de la care fiecare celulă a corpului e liberă (coada după 2 pași,
+        # fiindcă motorul verifică ciocnirea înainte să mute coada)
+        return {cell: i + 2 for i, cell in enumerate(reversed(engine.body))}
+
+    def _find(self, start, goal, free_at):
+        """Lista celulelor de la start (exclus) la goal, inversată, sau None"""
+        self.generation += 1
+        generation = self.generation
+        mark, dist, parent = self.mark, self.dist, self.parent
+        neighbours = self.grid.neighbours
+        mark[start] = generation
+        dist[start] = 0
+
+        if self.search == 'astar':
+            xs, ys = self.grid.xs, self.grid.ys
+            gx, gy = xs[goal], ys[goal]
+            frontier = [(abs(xs[start] - gx) + abs(ys[start] - gy), 0, start)]
+            pop, push = heapq.heappop, heapq.heappush
+            while frontier:
+                _, steps, cell = pop(frontier)
+                if cell == goal:
+                    return self._path(start, goal)
+                if steps > dist[cell]:
+                    continue
+                steps += 1
+                for _, nxt in neighbours[cell]:
+                    if free_at.get(nxt, 0) > steps:
+                        continue
+                    if mark[nxt] != generation or steps < dist[nxt]:
+                        mark[nxt] = generation
+                        dist[nxt] = steps
+                        parent[nxt] = cell
+                        push(frontier, (steps + abs(xs[nxt] - gx) + abs(ys[nxt] - gy), steps, nxt))
+            return None
+
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            if cell == goal:
+                return self._path(start, goal)
+            steps = dist[cell] + 1
+            for _, nxt in neighbours[cell]:
+                if mark[nxt] != generation and free_at.get(nxt, 0) <= steps:
+                    mark[nxt] = generation
+                    dist[nxt] = steps
+                    parent[nxt] = cell
+                    queue.append(nxt)
+        return None
+
+    def _path(self, start, goal):
+        path = []
+        cell = goal
+        while cell != start:
+            path.append(cell)
+            cell = self.parent[cell]
+        return path
+
+
+@register_agent('bfs')
+class BFSAgent(PathAgent):
+    """Ca PathAgent, cu căutare în lățime în loc de A*"""
+
+    search = 'bfs'
+
+
+def hamiltonian_cycle(width, height):
+    """Ordinea celulelor pe un ciclu care trece o dată prin toată tabla
+
+    Rândul 0 spre dreapta, apoi șerpuit pe rândurile următoare fără coloana
+    0, înapoi pe coloana 0. Cere înălțimea pară (sau lățimea, prin
+    transpunere); pe o tablă cu ambele dimensiuni impare nu există ciclu.
+    """
+    if height % 2 and width % 2:
+        raise ValueError("Ciclul hamiltonian cere o tablă cu o latură pară")
+    if height % 2:
+        return [(cell % height) * width + cell // height for cell in hamiltonian_cycle(height, width)]
+    cycle = [x for x in range(width)]
+    for y in range(1, height):
+        row = range(width - 1, 0, -1) if y % 2 else range(1, width)
+        cycle.extend(y * width + x for x in row)
+    cycle.extend(y * width for y in range(height - 1, 0, -1))
+    return cycle
+
+
+@register_agent('hamilton')
+class HamiltonAgent(Agent):
+    """Urmează un ciclu hamiltonian, cu scurtături cât timp e loc
+
+    Corpul stă mereu în ordinea ciclului între coadă și cap, deci a merge
+    pe ciclu nu poate lovi niciodată corpul și tabla se umple sigur. Cât
+    timp șarpele ocupă sub jumătate din tablă, agentul sare înainte pe ciclu
+    spre măr, fără să treacă de coadă (cu o rezervă pentru creștere).
+    Ordinea pe ciclu este calculată o dată, distanța pe ciclu este O(1).
+    """
+
+    BUFFER = 3
+
+    def __init__(self, width, height):
+        super().__init__(width, height)
+        cycle = hamiltonian_cycle(width, height)
+        self.order = [0] * self.grid.cells
+        for index, cell in enumerate(cycle):
+            self.order[cell] = index
+        self.following = [0] * self.grid.cells  # direcția spre celula următoare pe ciclu
+        for index, cell in enumerate(cycle):
+            self.following[cell] = self.grid.direction_to[cell][cycle[(index + 1) % len(cycle)]]
+
+    def act(self, engine):
+        body = engine.body
+        head = body[0]
+        cells = self.grid.cells
+        order = self.order
+        if len(body) * 2 >= cells or engine.apple_cell < 0:
+            return self.following[head]
+
+        head_index = order[head]
+        to_tail = (order[body[-1]] - head_index) % cells
+        to_apple = (order[engine.apple_cell] - head_index) % cells
+        available = to_tail - len(body) // 4 - self.BUFFER
+        if to_apple < to_tail:
+            available -= 1  # mărul de pe drum lungește șarpele
+        available = min(available, to_apple)
+
+        best, best_distance = self.following[head], 1
+        for direction, cell in self.grid.neighbours[head]:
+            if engine.occupied[cell]:
+                continue
+            distance = (order[cell] - head_index) % cells
+            if best_distance < distance <= available:
+                best, best_distance = direction, distance
+        return best
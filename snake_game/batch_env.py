@@ -0,0 +1,215 @@
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from engine import START, RIGHT, SnakeEngine
+
+# Aceleași direcții ca în engine.py: UP, DOWN, LEFT, RIGHT
+DX = np.array([0, 0, -1, 1])
+DY = np.array([-1, 1, 0, 0])
+OPPOSITE = np.array([1, 0, 3, 2])
+KEEP = -1  # acțiune: păstrează direcția
+
+
+class BatchSnakeEnv:
+    """N jocuri Snake independente, avansate toate odată cu NumPy
+
+    Fiecare joc are o tablă de ocupare (n, celule), iar corpul este un buffer
+    circular de celule: capul este la head_ptr, coada la head_ptr - length + 1.
+    Un pas costă deci O(n) operații vectorizate, oricât de lungi ar fi
+    șerpii. Jocurile terminate pornesc singure din nou.
+
+    Regulile sunt cele din SnakeEngine, dar merele vin din RNG-ul NumPy, deci
+    jocurile nu sunt identice cu cele din engine.py pentru același seed.
+    """
+
+    def __init__(self, n, width=30, height=20, seed=None):
+        self.n = n
+        self.width = width
+        self.height = height
+        self.cells = width * height
+        self.rng = np.random.default_rng(seed)
+
+        self.occupied = np.zeros((n, self.cells), dtype=bool)
+        self.body = np.zeros((n, self.cells), dtype=np.int32)
+        self.head_ptr = np.zeros(n, dtype=np.int32)
+        self.length = np.zeros(n, dtype=np.int32)
+        self.heads = np.zeros((n, 2), dtype=np.int32)  # (x, y)
+        self.directions = np.zeros(n, dtype=np.int8)
+        self.apples = np.zeros(n, dtype=np.int32)
+        self.scores = np.zeros(n, dtype=np.int32)
+        self.steps = np.zeros(n, dtype=np.int32)
+        # Scorul și numărul de pași ai jocurilor terminate la ultimul step()
+        self.final_scores = np.zeros(n, dtype=np.int32)
+        self.final_steps = np.zeros(n, dtype=np.int32)
+
+        # Vederi plate, indexate cu joc * celule + celulă
+        self._occupied_flat = self.occupied.reshape(-1)
+        self._body_flat = self.body.reshape(-1)
+        self._base = np.arange(n, dtype=np.int64) * self.cells
+        self._start_cells = np.array([y * width + x for x, y in reversed(START)], dtype=np.int32)
+        self.reset()
+
+    def reset(self, games=None):
+        """Repornește jocurile date (implicit toate)"""
+        games = np.arange(self.n) if games is None else games
+        if len(games) == 0:
+            return
+        start = self._start_cells
+        base = self._base[games][:, None]
+
+        # Se golesc doar celulele corpului vechi, nu toată tabla
+        offsets = np.arange(self.length[games].max())
+        ring = (self.head_ptr[games][:, None] - offsets) % self.cells
+        cells = self._body_flat[base + ring]
+        self._occupied_flat[(base + cells)[offsets < self.length[games][:, None]]] = False
+
+        self._occupied_flat[base + start] = True
+        # Coada la poziția 0, capul la len(START) - 1
+        self.body[games, :len(start)] = start
+        self.head_ptr[games] = len(start) - 1
+        self.length[games] = len(start)
+        self.heads[games] = START[0]
+        self.directions[games] = RIGHT
+        self.scores[games] = 0
+        self.steps[games] = 0
+        self.apples[games] = self._sample_free(games)
+
+    def _sample_free(self, games):
+        # Uniform dintre celulele libere: celule aleatorii, trase din nou cât
+        # timp cad pe șarpe; după câteva încercări (șarpe foarte lung) se ia
+        # cheia aleatorie maximă dintre celulele libere
+        apples = self.rng.integers(0, self.cells, len(games), dtype=np.int32)
+        base = games * self.cells
+        taken = self._occupied_flat[base + apples]
+        for _ in range(8):
+            if not taken.any():
+                return apples
+            redo = np.flatnonzero(taken)
+            apples[redo] = self.rng.integers(0, self.cells, len(redo), dtype=np.int32)
+            taken[redo] = self._occupied_flat[base[redo] + apples[redo]]
+        redo = np.flatnonzero(taken)
+        if len(redo):
+            keys = self.rng.random((len(redo), self.cells))
+            keys[self.occupied[games[redo]]] = -1.0
+            apples[redo] = keys.argmax(axis=1)
+        return apples
+
+    def step(self, actions=None):
+        """Avansează toate jocurile cu un tick, returnează (recompense, terminate)
+
+        actions are câte o direcție (sau KEEP) pentru fiecare joc; jocurile
+        terminate sunt repornite, iar scorul lor final rămâne în final_scores.
+        """
+        if actions is not None:
+            actions = np.asarray(actions)
+            turn = (actions >= 0) & (actions != OPPOSITE[self.directions])
+            self.directions = np.where(turn, actions, self.directions).astype(np.int8)
+
+        x = self.heads[:, 0] + DX[self.directions]
+        y = self.heads[:, 1] + DY[self.directions]
+        self.steps += 1
+
+        # Coliziune cu pereții sau cu corpul (coada se mută abia după)
+        wall = (x < 0) | (x >= self.width) | (y < 0) | (y >= self.height)
+        new_head = np.where(wall, 0, y * self.width + x).astype(np.int32)
+        dead = wall | self._occupied_flat[self._base + new_head]
+        alive = ~dead
+        eat = alive & (new_head == self.apples)
+
+        # Capul nou pentru jocurile care continuă
+        live = np.flatnonzero(alive)
+        base = self._base[live]
+        head_ptr = (self.head_ptr[live] + 1) % self.cells
+        self.head_ptr[live] = head_ptr
+        self._body_flat[base + head_ptr] = new_head[live]
+        self._occupied_flat[base + new_head[live]] = True
+        self.heads[live, 0] = x[live]
+        self.heads[live, 1] = y[live]
+
+        # Coada se eliberează doar dacă șarpele nu a mâncat
+        moving = np.flatnonzero(alive & ~eat)
+        base = self._base[moving]
+        tail_ptr = (self.head_ptr[moving] - self.length[moving]) % self.cells
+        self._occupied_flat[base + self._body_flat[base + tail_ptr]] = False
+
+        rewards = eat.astype(np.int8) - dead.astype(np.int8)
+        done = dead
+        eaters = np.flatnonzero(eat)
+        if len(eaters):
+            self.length[eaters] += 1
+            self.scores[eaters] += 1
+            full = self.length[eaters] == self.cells
+            done = dead.copy()
+            done[eaters[full]] = True
+            hungry = eaters[~full]
+            self.apples[hungry] = self._sample_free(hungry)
+
+        finished = np.flatnonzero(done)
+        if len(finished):
+            self.final_scores[finished] = self.scores[finished]
+            self.final_steps[finished] = self.steps[finished]
+            self.reset(finished)
+        return rewards, done
+
+    def observe(self):
+        """Tablele ca (n, height, width): 0 liber, 1 corp, 2 cap, 3 măr"""
+        boards = self.occupied.astype(np.int8)
+        games = np.arange(self.n)
+        boards[games, self.body[games, self.head_ptr]] = 2
+        boards[games, self.apples] = 3
+        return boards.reshape(self.n, self.height, self.width)
+
+
+def random_actions(rng, n):
+    # 20% șanse de viraj la fiecare pas, altfel KEEP
+    return np.where(rng.random(n) < 0.2, rng.integers(0, 4, n), KEEP)
+
+
+def run_shard(args):
+    """Rulează un lot de jocuri cu acțiuni aleatorii, returnează (pași, jocuri, scor total)"""
+    n, steps, seed = args
+    env = BatchSnakeEnv(n, seed=seed)
+    rng = np.random.default_rng(seed + 1)
+    games = score = 0
+    for _ in range(steps):
+        _, done = env.step(random_actions(rng, n))
+        games += int(done.sum())
+        score += int(env.final_scores[done].sum())
+    return n * steps, games, score
+
+
+def run_parallel(n, steps, workers=None, seed=0):
+    """Împarte n jocuri pe un pool de procese (implicit câte unul pe nucleu)"""
+    workers = workers or os.cpu_count() or 1
+    shards = [(n // workers + (i < n % workers), steps, seed + 1000 * i) for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run_shard, [shard for shard in shards if shard[0]]))
+    return tuple(sum(values) for values in zip(*results))
+
+
+if __name__ == "__main__":
+    # Comparație: jocuri unul câte unul vs. în lot vs. loturi pe toate nucleele
+    engine = SnakeEngine(seed=0)
+    rng = np.random.default_rng(1)
+    actions = random_actions(rng, 200000).tolist()
+    start = time.perf_counter()
+    for i, action in enumerate(actions):
+        _, done = engine.step(None if action == KEEP else action)
+        if done:
+            engine.reset(seed=i)
+    single = len(actions) / (time.perf_counter() - start)
+    print(f"SnakeEngine, un joc:        {single:12,.0f} pași/s")
+
+    start = time.perf_counter()
+    total, _, _ = run_shard((4096, 200, 0))
+    batch = total / (time.perf_counter() - start)
+    print(f"BatchSnakeEnv, 4096 jocuri: {batch:12,.0f} pași/s ({batch / single:.0f}x)")
+
+    start = time.perf_counter()
+    total, games, score = run_parallel(4096 * (os.cpu_count() or 1), 200)
+    parallel = total / (time.perf_counter() - start)
+    print(f"{os.cpu_count()} procese:                {parallel:12,.0f} pași/s ({parallel / single:.0f}x), "
+          f"{games} jocuri terminate, scor mediu {score / max(games, 1):.2f}")
@@ -0,0 +1,180 @@
+import random
+import time
+from array import array
+from collections import deque
+
+# Direcții (indici în DELTAS)
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+DELTAS = ((0, -1), (0, 1), (-1, 0), (1, 0))
+OPPOSITE = (DOWN, UP, RIGHT, LEFT)
+
+# Șarpele de la început, de la cap la coadă
+START = ((5, 2), (4, 2), (3, 2))
+
+
+class SnakeEngine:
+    """Logica jocului Snake, fără pygame și fără ecran
+
+    Tabla are width x height celule. Intern fiecare celulă este un indice
+    y * width + x: corpul este un deque (cap la stânga), occupied marchează
+    celulele corpului, iar free ține toate celulele libere, cu poziția
+    fiecăreia în free_pos. Astfel un tick costă O(1) oricât de lung ar fi
+    șarpele, iar mărul se alege uniform dintre celulele libere tot în O(1).
+
+    Merele sunt generate dintr-un RNG propriu, așa că aceeași valoare de
+    seed și aceleași acțiuni dau mereu același joc.
+    """
+
+    def __init__(self, width=30, height=20, seed=None):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self._start = None
+        self.reset()
+
+    def reset(self, seed=None):
+        """Începe un joc nou (cu același seed dacă nu primește altul)"""
+        if seed is not None:
+            self.seed = seed
+        self.rng = random.Random(self.seed)
+        if self._start is None:
+            self._build_start()
+        occupied, free, free_pos, body = self._start
+        self.occupied = occupied[:]
+        self.free = free[:]
+        self.free_pos = free_pos[:]
+        self.body = deque(body)
+        self.direction = RIGHT
+        self.apple_cell = self.generate_apple()
+        self.score = 0
+        self.steps = 0
+        self.done = False
+        return self.state()
+
+    def _build_start(self):
+        # Tabla de start se construiește o singură dată, reset() doar o copiază
+        cells = self.width * self.height
+        self.occupied = bytearray(cells)
+        self.free = list(range(cells))
+        self.free_pos = list(range(cells))
+        body = [y * self.width + x for x, y in START]
+        for cell in body:
+            self._occupy(cell)
+        self._start = (self.occupied, self.free, self.free_pos, body)
+
+    def _occupy(self, cell):
+        # Scoate celula din free: o mutăm pe ultima în locul ei
+        self.occupied[cell] = 1
+        index = self.free_pos[cell]
+        last = self.free.pop()
+        if last != cell:
+            self.free[index] = last
+            self.free_pos[last] = index
+        self.free_pos[cell] = -1
+
+    def _release(self, cell):
+        self.occupied[cell] = 0
+        self.free_pos[cell] = len(self.free)
+        self.free.append(cell)
+
+    def generate_apple(self):
+        """O celulă liberă aleasă uniform, -1 dacă tabla e plină"""
+        if not self.free:
+            return -1
+        return self.free[self.rng.randrange(len(self.free))]
+
+    def step(self, action=None):
+        """Avansează jocul cu un tick, returnează (recompensă, terminat)
+
+        action este UP/DOWN/LEFT/RIGHT sau None (păstrează direcția);
+        întoarcerea în sens opus este ignorată.
+        """
+        if self.done:
+            return 0, True
+        if action is not None and action != OPPOSITE[self.direction]:
+            self.direction = action
+
+        dx, dy = DELTAS[self.direction]
+        width = self.width
+        head = self.body[0]
+        x = head % width + dx
+        y = head // width + dy
+        self.steps += 1
+
+        # Coliziune cu pereții
+        if not (0 <= x < width and 0 <= y < self.height):
+            self.done = True
+            return -1, True
+        # Coliziune cu corpul (coada se mută abia după, ca în jocul original)
+        new_head = y * width + x
+        if self.occupied[new_head]:
+            self.done = True
+            return -1, True
+
+        self.body.appendleft(new_head)
+        self._occupy(new_head)
+
+        # Mâncare
+        if new_head == self.apple_cell:
+            self.score += 1
+            self.apple_cell = self.generate_apple()
+            if self.apple_cell < 0:
+                # Șarpele a umplut tabla
+                self.done = True
+                return 1, True
+            return 1, False
+        self._release(self.body.pop())
+        return 0, False
+
+    def snapshot(self):
+        """Starea completă, inclusiv RNG-ul și ordinea celulelor libere
+
+        Din ea restore() continuă jocul exact ca originalul (ordinea din free
+        decide ce măr iese din RNG).
+        """
+        return (self.rng.getstate(), self.direction, self.apple_cell, self.score,
+                self.steps, self.done, tuple(self.body),
+                array('H' if len(self.occupied) <= 0x10000 else 'I', self.free))
+
+    def restore(self, snapshot):
+        rng_state, self.direction, self.apple_cell, self.score, self.steps, self.done, body, free = snapshot
+        self.rng.setstate(rng_state)
+        self.body = deque(body)
+        self.occupied = bytearray(self.width * self.height)
+        for cell in body:
+            self.occupied[cell] = 1
+        self.free = free.tolist()
+        self.free_pos = [-1] * len(self.occupied)
+        for index, cell in enumerate(self.free):
+            self.free_pos[cell] = index
+
+    def xy(self, cell):
+        return cell % self.width, cell // self.width
+
+    @property
+    def snake(self):
+        """Corpul ca listă de (x, y), de la cap la coadă"""
+        return [self.xy(cell) for cell in self.body]
+
+    @property
+    def apple(self):
+        return self.xy(self.apple_cell)
+
+    def state(self):
+        """Stare compactă: (direcție, măr, corp de la cap la coadă), în indici de celule"""
+        return self.direction, self.apple_cell, tuple(self.body)
+
+
+if __name__ == "__main__":
+    # Test de viteză fără ecran: jocuri cu acțiuni aleatorii
+    engine = SnakeEngine(seed=0)
+    actions = random.Random(1)
+    steps = 0
+    start = time.perf_counter()
+    while steps < 500000:
+        reward, done = engine.step(actions.randrange(4) if actions.random() < 0.2 else None)
+        steps += 1
+        if done:
+            engine.reset(seed=steps)
+    elapsed = time.perf_counter() - start
+    print(f"{steps} pași în {elapsed:.2f} s ({steps / elapsed:,.0f} pași/s)")
@@ -1,109 +1,234 @@
-import pygame
-import sys
+import argparse
+import atexit
+import os
 import random
+import sys
+import time
+from collections import deque
+
+import pygame
 
-# Inițializare Pygame
-pygame.init()
+from engine import SnakeEngine, UP, DOWN, LEFT, RIGHT, OPPOSITE
+from renderer import Renderer
+from replay import Recorder, Replay, ReplayLog
+from telemetry import FrameStats
 
 # Dimensiuni
 width = 600
 height = 400
 block_size = 20
 
-# Culori
-BLACK = (0, 0, 0)
-GREEN = (0, 255, 0)
-RED = (255, 0, 0)
-WHITE = (255, 255, 255)
-
-# Ecran
-screen = pygame.display.set_mode((width, height))
-pygame.display.set_caption('🐍 Snake Game - Etapa 4')
-
-# Framerate
-clock = pygame.time.Clock()
-FPS = 10
-
-# Inițializare șarpe și direcție
-snake = [(100, 50), (80, 50), (60, 50)]
-direction = 'RIGHT'
-
-# Funcție desen șarpe
-def draw_snake(snake):
-    for segment in snake:
-        pygame.draw.rect(screen, GREEN, pygame.Rect(segment[0], segment[1], block_size, block_size))
-
-# Funcție generare măr
-def generate_apple():
-    x = random.randint(0, (width - block_size) // block_size) * block_size
-    y = random.randint(0, (height - block_size) // block_size) * block_size
-    return (x, y)
-
-# Inițializare măr
-apple_pos = generate_apple()
-
-# Funcție Game Over
-def game_over():
-    font = pygame.font.SysFont('Arial', 36)
-    text = font.render('Game Over!', True, WHITE)
-    screen.blit(text, (width // 2 - 100, height // 2 - 20))
-    pygame.display.update()
+# Cadre pe secundă pentru desenare; simularea merge separat, în tick-uri
+RENDER_FPS = 144
+
+# Niveluri de viteză: tick-uri de simulare pe secundă (tastele 1-9, +/-)
+SPEEDS = (5, 8, 10, 12, 15, 20, 30, 60, 120)
+DEFAULT_SPEED = 2  # 10 tick-uri/s, viteza jocului original
+
+# Peste atâtea tick-uri într-un cadru (fereastră mutată, sistem blocat)
+# restul se aruncă, ca jocul să nu încerce să recupereze la nesfârșit
+MAX_TICKS_PER_FRAME = 10
+
+# Jocurile terminate se salvează aici; la rejucare săgețile sar cu atâtea tick-uri
+REPLAY_DIR = 'replays'
+SEEK_TICKS = 100
+
+# Taste -> direcții
+KEYS = {
+    pygame.K_UP: UP,
+    pygame.K_DOWN: DOWN,
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+}
+SPEED_KEYS = {getattr(pygame, f'K_{i + 1}'): i for i in range(len(SPEEDS))}
+
+
+class InputQueue:
+    """Direcțiile apăsate, câte una consumată la fiecare tick
+
+    Două taste apăsate repede în același tick nu se mai pierd: fiecare ajunge
+    în tick-ul ei. O direcție este validată față de ultima din coadă (sau
+    față de direcția curentă), deci o întoarcere în sens opus nu poate trece
+    prin două viraje apăsate în același tick.
+    """
+
+    def __init__(self, size=3):
+        self.size = size
+        self.queue = deque()
+
+    def push(self, direction, current):
+        last = self.queue[-1] if self.queue else current
+        if direction != last and direction != OPPOSITE[last] and len(self.queue) < self.size:
+            self.queue.append(direction)
+
+    def pop(self):
+        return self.queue.popleft() if self.queue else None
+
+    def clear(self):
+        self.queue.clear()
+
+
+# Funcție Game Over (fontul și textul sunt randate o singură dată)
+def game_over(renderer):
+    renderer.draw_text('Game Over!', 36, (width // 2, height // 2))
     pygame.time.delay(2000)
+
+
+def set_caption(speed):
+    pygame.display.set_caption(f'🐍 Snake Game - Etapa 4 - viteza {speed + 1} ({SPEEDS[speed]} tick/s)')
+
+
+def game_loop(screen, engine, advance, speed, on_key=None, telemetry=None):
+    """Bucla cu pas fix, comună jocului și rejucării
+
+    advance() face un tick de simulare; on_key(key) primește tastele care nu
+    schimbă viteza. Simularea avansează în tick-uri de 1 / SPEEDS[speed]
+    secunde, oricât de des se desenează; timpul rămas (accumulator) dă
+    fracțiunea pentru interpolare. Returnează False dacă fereastra a fost
+    închisă, True dacă jocul s-a terminat.
+
+    Cu telemetry (un telemetry.FrameStats) se măsoară fiecare fază a
+    cadrului, iar F3 arată/ascunde overlay-ul; fără, bucla nu face nicio
+    măsurătoare.
+    """
+    clock = pygame.time.Clock()
+    renderer = Renderer(screen, block_size)
+    set_caption(speed)
+    overlay = telemetry is not None
+    accumulator = 0.0
+    previous = time.perf_counter()
+    while True:
+        if telemetry is not None:
+            telemetry.begin_frame()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                return False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_F3 and telemetry is not None:
+                    overlay = not overlay
+                    renderer.invalidate()
+                    continue
+                elif event.key in SPEED_KEYS:
+                    speed = SPEED_KEYS[event.key]
+                elif event.key in (pygame.K_PLUS, pygame.K_EQUALS, pygame.K_KP_PLUS):
+                    speed = min(speed + 1, len(SPEEDS) - 1)
+                elif event.key in (pygame.K_MINUS, pygame.K_KP_MINUS):
+                    speed = max(speed - 1, 0)
+                else:
+                    if on_key:
+                        on_key(event.key)
+                    continue
+                set_caption(speed)
+
+        if telemetry is not None:
+            telemetry.mark('events')
+
+        now = time.perf_counter()
+        accumulator += now - previous
+        previous = now
+        tick = 1.0 / SPEEDS[speed]
+
+        ticks = 0
+        while accumulator >= tick and not engine.done:
+            advance()
+            accumulator -= tick
+            ticks += 1
+            if ticks == MAX_TICKS_PER_FRAME:
+                accumulator = min(accumulator, tick)
+                break
+        if telemetry is not None:
+            telemetry.mark('simulation', ticks)
+        if engine.done:
+            renderer.draw(engine)
+            renderer.present()
+            game_over(renderer)
+            return True
+
+        # Randare: doar celulele schimbate, capul și coada interpolate
+        renderer.draw(engine, min(accumulator / tick, 1.0))
+        if telemetry is not None:
+            if overlay:
+                renderer.draw_overlay(telemetry.overlay_lines())
+            telemetry.mark('draw')
+        renderer.present()
+        if telemetry is not None:
+            telemetry.mark('display')
+        # tick() doarme până la următorul cadru, nu ține procesorul ocupat
+        clock.tick(RENDER_FPS)
+
+
+def main(seed=None, speed=DEFAULT_SPEED, record_dir=REPLAY_DIR, telemetry=None):
+    # Inițializare Pygame
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+
+    # Fără seed explicit se alege unul, ca jocul să poată fi înregistrat
+    if seed is None:
+        seed = random.getrandbits(32)
+
+    # Logica jocului stă în SnakeEngine, aici doar citim tastele și desenăm
+    engine = SnakeEngine(width // block_size, height // block_size, seed)
+    recorder = Recorder(engine.width, engine.height, seed)
+    inputs = InputQueue()
+
+    def advance():
+        action = inputs.pop()
+        recorder.record(action)
+        engine.step(action)
+
+    def on_key(key):
+        if key in KEYS:
+            inputs.push(KEYS[key], engine.direction)
+
+    game_loop(screen, engine, advance, speed, on_key, telemetry)
+
+    # Jocul se salvează ca seed + acțiuni (câteva zeci de octeți)
+    if record_dir and recorder.ticks:
+        os.makedirs(record_dir, exist_ok=True)
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{seed}-{engine.score}.snkr"
+        recorder.save(os.path.join(record_dir, name), engine.score)
+
+    pygame.quit()
+    sys.exit()
+
+
+def watch(path, speed=len(SPEEDS) - 1, telemetry=None):
+    """Rejucă un fișier .snkr în fereastră; săgețile stânga/dreapta sar înapoi/înainte"""
+    pygame.init()
+    screen = pygame.display.set_mode((width, height))
+    replay = Replay(ReplayLog.load(path))
+
+    def on_key(key):
+        if key == pygame.K_LEFT:
+            replay.seek(replay.tick - SEEK_TICKS)
+        elif key == pygame.K_RIGHT:
+            replay.seek(replay.tick + SEEK_TICKS)
+
+    def advance():
+        # Un joc închis înainte de Game Over se oprește la ultimul tick
+        if not replay.finished:
+            replay.step()
+
+    # Seek-ul schimbă starea lui replay.engine pe loc, renderer-ul observă
+    # saltul și redesenează tot
+    game_loop(screen, replay.engine, advance, speed, on_key, telemetry)
     pygame.quit()
     sys.exit()
 
-# Buclă principală
-running = True
-while running:
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-
-        elif event.type == pygame.KEYDOWN:
-            if event.key == pygame.K_UP and direction != 'DOWN':
-                direction = 'UP'
-            elif event.key == pygame.K_DOWN and direction != 'UP':
-                direction = 'DOWN'
-            elif event.key == pygame.K_LEFT and direction != 'RIGHT':
-                direction = 'LEFT'
-            elif event.key == pygame.K_RIGHT and direction != 'LEFT':
-                direction = 'RIGHT'
-
-    # Mișcare
-    x, y = snake[0]
-    if direction == 'UP':
-        y -= block_size
-    elif direction == 'DOWN':
-        y += block_size
-    elif direction == 'LEFT':
-        x -= block_size
-    elif direction == 'RIGHT':
-        x += block_size
-
-    new_head = (x, y)
-
-    # Coliziune cu pereții
-    if x < 0 or x >= width or y < 0 or y >= height:
-        game_over()
-
-    # Coliziune cu corpul
-    if new_head in snake:
-        game_over()
-
-    snake.insert(0, new_head)
-
-    # Mâncare
-    if new_head == apple_pos:
-        apple_pos = generate_apple()
-    else:
-        snake.pop()
-
-    # Randare
-    screen.fill(BLACK)
-    draw_snake(snake)
-    pygame.draw.rect(screen, RED, pygame.Rect(apple_pos[0], apple_pos[1], block_size, block_size))
-    pygame.display.update()
-    clock.tick(FPS)
-
-pygame.quit()
-sys.exit()
\ No newline at end of file
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Snake; cu un fișier .snkr îl rejucă")
+    parser.add_argument('replay', nargs='?', help="fișier de rejucat")
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--speed', type=int, choices=range(1, len(SPEEDS) + 1), help="nivelul de viteză (1-9)")
+    parser.add_argument('--telemetry', action='store_true', help="măsoară timpii pe cadru, F3 arată overlay-ul")
+    parser.add_argument('--telemetry-out', metavar='FILE',
+                        help="la ieșire scrie măsurătorile în FILE (.csv sau .json); implică --telemetry")
+    args = parser.parse_args()
+
+    stats = FrameStats(RENDER_FPS) if args.telemetry or args.telemetry_out else None
+    if stats is not None and args.telemetry_out:
+        atexit.register(stats.export, args.telemetry_out)
+    if args.replay:
+        watch(args.replay, args.speed - 1 if args.speed else len(SPEEDS) - 1, stats)
+    main(args.seed, args.speed - 1 if args.speed else DEFAULT_SPEED, telemetry=stats)
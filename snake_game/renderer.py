@@ -0,0 +1,208 @@
+from collections import deque
+from functools import lru_cache
+
+import pygame
+
+# Culori
+BLACK = (0, 0, 0)
+GREEN = (0, 255, 0)
+RED = (255, 0, 0)
+WHITE = (255, 255, 255)
+
+
+@lru_cache(maxsize=None)
+def get_font(name, size):
+    """Fontul se încarcă o singură dată, SysFont caută prin fonturile sistemului"""
+    return pygame.font.SysFont(name, size)
+
+
+@lru_cache(maxsize=None)
+def render_text(text, size, color=WHITE, name='Arial'):
+    """Textul randat, refolosit cât timp nu se schimbă"""
+    return get_font(name, size).render(text, True, color)
+
+
+class Renderer:
+    """Desenează SnakeEngine incremental, doar celulele care s-au schimbat
+
+    Renderer ține o copie a corpului desenat la ultimul cadru. La fiecare
+    cadru desenează celulele noi de la cap, șterge celulele eliberate de coadă
+    și mută mărul, apoi present() trimite doar acele dreptunghiuri la
+    pygame.display.update(rects). Un cadru costă deci cât numărul de pași
+    făcuți de la cadrul trecut, nu cât lungimea șarpelui. Între tick-uri se
+    redesenează doar capul și coada, interpolate.
+    """
+
+    def __init__(self, screen, block_size):
+        self.screen = screen
+        self.block_size = block_size
+        self.background = BLACK
+        # Celulele pre-randate, convertite la formatul ecranului
+        self.sprites = {
+            'snake': self._sprite(GREEN),
+            'apple': self._sprite(RED),
+        }
+        self.drawn = None  # corpul desenat la ultimul cadru
+        self.apple_cell = -1
+        self.steps = 0
+        self.vacated = None  # celula eliberată de coadă la ultimul tick
+        self.partial = False  # capul și coada sunt desenate parțial
+        self.dirty = []
+        self._overlay = None
+        self._overlay_lines = None
+
+    def _sprite(self, color):
+        surface = pygame.Surface((self.block_size, self.block_size)).convert()
+        surface.fill(color)
+        return surface
+
+    def rect(self, engine, cell):
+        x, y = engine.xy(cell)
+        return pygame.Rect(x * self.block_size, y * self.block_size, self.block_size, self.block_size)
+
+    def _blit(self, engine, cell, sprite):
+        rect = self.rect(engine, cell)
+        if sprite is None:
+            self.screen.fill(self.background, rect)
+        else:
+            self.screen.blit(self.sprites[sprite], rect)
+        self.dirty.append(rect)
+
+    def full_redraw(self, engine):
+        """Redesenează tot ecranul (la început sau după reset)"""
+        self.screen.fill(self.background)
+        for cell in engine.body:
+            self.screen.blit(self.sprites['snake'], self.rect(engine, cell))
+        if engine.apple_cell >= 0:
+            self.screen.blit(self.sprites['apple'], self.rect(engine, engine.apple_cell))
+        self.drawn = deque(reversed(engine.body))  # de la coadă la cap, capul la dreapta
+        self.apple_cell = engine.apple_cell
+        self.steps = engine.steps
+        self.vacated = None
+        self.partial = False
+        self.dirty = [self.screen.get_rect()]
+
+    def draw(self, engine, alpha=1.0):
+        """Desenează ce s-a schimbat de la ultimul cadru (pe ecran după present())
+
+        alpha (între 0 și 1) este cât a trecut din tick-ul curent: capul intră
+        treptat în celula nouă și coada iese treptat din celula eliberată, așa
+        că mișcarea rămâne lină când cadrele sunt mai dese decât tick-urile.
+        """
+        moved = engine.steps - self.steps
+        body = engine.body
+        if self.drawn is None or not 0 <= moved < len(body) or body[moved] != self.drawn[-1]:
+            # Joc nou (capul desenat nu mai e în corp) sau prea mulți pași de
+            # urmărit: se redesenează tot
+            self.full_redraw(engine)
+        elif moved:
+            self._advance(engine, moved)
+        if alpha < 1 or self.partial:
+            self._draw_partial(engine, alpha)
+
+    def present(self):
+        """Trimite la ecran doar zonele desenate de la ultimul present()"""
+        if self.dirty:
+            pygame.display.update(self.dirty)
+            self.dirty = []
+
+    def invalidate(self):
+        """Următorul draw() redesenează tot ecranul"""
+        self.drawn = None
+
+    def draw_overlay(self, lines, size=14):
+        """Text pe un fundal opac în colțul din stânga sus, refăcut doar când se schimbă"""
+        if lines != self._overlay_lines:
+            font = get_font('Arial', size)
+            rendered = [font.render(line, True, WHITE) for line in lines]
+            width = max((surface.get_width() for surface in rendered), default=0) + 8
+            height = sum(surface.get_height() for surface in rendered) + 6
+            overlay = pygame.Surface((max(width, self._overlay.get_width() if self._overlay else 0),
+                                      max(height, self._overlay.get_height() if self._overlay else 0))).convert()
+            overlay.fill(BLACK)
+            y = 3
+            for surface in rendered:
+                overlay.blit(surface, (4, y))
+                y += surface.get_height()
+            self._overlay = overlay
+            self._overlay_lines = lines
+        if self._overlay:
+            self.dirty.append(self.screen.blit(self._overlay, (0, 0)))
+
+    def _advance(self, engine, moved):
+        body = engine.body
+        if self.partial:
+            # Celulele desenate parțial la cadrul trecut se refac întregi
+            self._repair(engine, self.drawn[-1])
+            if self.vacated is not None:
+                self._repair(engine, self.vacated)
+
+        # Capetele noi sunt primele `moved` celule din corp
+        for i in range(moved - 1, -1, -1):
+            cell = body[i]
+            self.drawn.append(cell)
+            self._blit(engine, cell, 'snake')
+
+        # Coada: celulele desenate care nu mai fac parte din corp
+        drawn = self.drawn
+        vacated = None
+        while len(drawn) > len(body):
+            vacated = drawn.popleft()
+            if not engine.occupied[vacated]:
+                self._blit(engine, vacated, None)
+            else:
+                vacated = None
+        # Coada se animă doar pentru un singur pas fără măr
+        self.vacated = vacated if moved == 1 else None
+
+        if engine.apple_cell != self.apple_cell:
+            # De obicei capul a mâncat mărul vechi, altfel (joc nou) se șterge
+            if self.apple_cell >= 0 and not engine.occupied[self.apple_cell]:
+                self._blit(engine, self.apple_cell, None)
+            self.apple_cell = engine.apple_cell
+            if engine.apple_cell >= 0:
+                self._blit(engine, engine.apple_cell, 'apple')
+        self.steps = engine.steps
+
+    def _repair(self, engine, cell):
+        if engine.occupied[cell]:
+            self._blit(engine, cell, 'snake')
+        elif cell == engine.apple_cell:
+            self._blit(engine, cell, 'apple')
+        else:
+            self._blit(engine, cell, None)
+
+    def _draw_partial(self, engine, alpha):
+        body = engine.body
+        self._fill_toward(engine, body[0], body[1], alpha)
+        if self.vacated is not None:
+            self._fill_toward(engine, self.vacated, body[-1], 1 - alpha)
+        self.partial = alpha < 1
+
+    def _fill_toward(self, engine, cell, neighbour, fraction):
+        # Umple doar fracțiunea din celulă lipită de vecinul ei din corp
+        rect = self.rect(engine, cell)
+        self.screen.fill(self.background, rect)
+        size = round(self.block_size * fraction)
+        if size > 0:
+            part = rect.copy()
+            x, y = engine.xy(cell)
+            nx, ny = engine.xy(neighbour)
+            dx, dy = nx - x, ny - y
+            if dx:
+                part.width = size
+                if dx > 0:
+                    part.right = rect.right
+            else:
+                part.height = size
+                if dy > 0:
+                    part.bottom = rect.bottom
+            self.screen.blit(self.sprites['snake'], part, pygame.Rect(0, 0, part.width, part.height))
+        self.dirty.append(rect)
+
+    def draw_text(self, text, size, center):
+        """Text peste joc; zona lui se redesenează la următorul full_redraw"""
+        surface = render_text(text, size)
+        rect = surface.get_rect(center=center)
+        self.screen.blit(surface, rect)
+        pygame.display.update(rect)
@@ -0,0 +1,168 @@
+import struct
+import sys
+import time
+
+from engine import SnakeEngine
+
+# Antet: magic, lățime, înălțime, seed, număr de tick-uri, scor final
+MAGIC = b'SNK1'
+HEADER = struct.Struct('<4sHHQII')
+NO_ACTION = 4  # tick fără tastă apăsată
+
+# La câte tick-uri se păstrează o stare completă pentru seek
+SNAPSHOT_EVERY = 256
+
+
+def _write_varint(out, value):
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def _read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+
+class Recorder:
+    """Înregistrează un joc ca seed + acțiunile de la fiecare tick
+
+    Se scriu doar tick-urile în care s-a apăsat ceva, fiecare ca un varint
+    (tick-uri de la apăsarea anterioară << 2 | direcție), de obicei un
+    singur octet. Un joc întreg are astfel câteva zeci de octeți plus
+    antetul de 24.
+    """
+
+    def __init__(self, width, height, seed):
+        if not isinstance(seed, int) or not 0 <= seed < 2 ** 64:
+            raise ValueError("Pentru înregistrare seed-ul trebuie să fie un întreg între 0 și 2**64 - 1")
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.ticks = 0
+        self.last_input = 0
+        self.events = bytearray()
+
+    def record(self, action):
+        """Acțiunea dată lui SnakeEngine.step() la tick-ul curent (None = nimic)"""
+        if action is not None:
+            _write_varint(self.events, (self.ticks - self.last_input) << 2 | action)
+            self.last_input = self.ticks
+        self.ticks += 1
+
+    def to_bytes(self, score):
+        return HEADER.pack(MAGIC, self.width, self.height, self.seed, self.ticks, score) + bytes(self.events)
+
+    def save(self, path, score):
+        with open(path, 'wb') as f:
+            f.write(self.to_bytes(score))
+
+
+class ReplayLog:
+    """Un joc înregistrat: antetul și acțiunea de la fiecare tick"""
+
+    def __init__(self, width, height, seed, ticks, score, actions):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.ticks = ticks
+        self.score = score
+        self.actions = actions  # bytearray, câte un octet pe tick, NO_ACTION dacă nimic
+
+    @classmethod
+    def from_bytes(cls, data):
+        if len(data) < HEADER.size or data[:4] != MAGIC:
+            raise ValueError("Nu este un fișier de replay Snake")
+        _, width, height, seed, ticks, score = HEADER.unpack_from(data)
+        actions = bytearray([NO_ACTION]) * ticks
+        pos = HEADER.size
+        tick = 0
+        try:
+            while pos < len(data):
+                value, pos = _read_varint(data, pos)
+                tick += value >> 2
+                actions[tick] = value & 3
+        except IndexError:
+            raise ValueError("Replay corupt: acțiuni după ultimul tick") from None
+        return cls(width, height, seed, ticks, score, actions)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+class Replay:
+    """Rulează un ReplayLog pe SnakeEngine, înainte sau sărind la orice tick
+
+    La fiecare SNAPSHOT_EVERY tick-uri se păstrează o stare completă a
+    motorului (doar în memorie, fișierul rămâne seed + acțiuni), așa că un
+    seek înapoi reia de la cea mai apropiată stare în loc de la început.
+    """
+
+    def __init__(self, log, snapshot_every=SNAPSHOT_EVERY):
+        self.log = log
+        self.snapshot_every = snapshot_every
+        self.engine = SnakeEngine(log.width, log.height, log.seed)
+        self.tick = 0
+        self.snapshots = [self.engine.snapshot()]
+
+    @property
+    def finished(self):
+        return self.tick >= self.log.ticks
+
+    def step(self):
+        """Avansează un tick, returnează (recompensă, terminat) ca SnakeEngine.step()"""
+        action = self.log.actions[self.tick]
+        result = self.engine.step(None if action == NO_ACTION else action)
+        self.tick += 1
+        if self.tick % self.snapshot_every == 0 and len(self.snapshots) == self.tick // self.snapshot_every:
+            self.snapshots.append(self.engine.snapshot())
+        return result
+
+    def seek(self, tick):
+        """Duce jocul la starea de după `tick` tick-uri"""
+        tick = max(0, min(tick, self.log.ticks))
+        if tick < self.tick or tick - self.tick > self.snapshot_every:
+            index = min(tick // self.snapshot_every, len(self.snapshots) - 1)
+            if index * self.snapshot_every > self.tick or tick < self.tick:
+                self.engine.restore(self.snapshots[index])
+                self.tick = index * self.snapshot_every
+        while self.tick < tick:
+            self.step()
+
+    def run(self):
+        """Rulează până la final, fără ecran, returnează scorul"""
+        self.seek(self.log.ticks)
+        return self.engine.score
+
+
+def verify(log):
+    """True dacă jocul rejucat merge exact log.ticks tick-uri și ajunge la scorul din antet"""
+    replay = Replay(log)
+    score = replay.run()
+    return replay.engine.steps == log.ticks and score == log.score
+
+
+if __name__ == "__main__":
+    # python replay.py fișier... : verifică scorurile și măsoară viteza de rejucare
+    total_ticks = 0
+    start = time.perf_counter()
+    failed = 0
+    for path in sys.argv[1:]:
+        log = ReplayLog.load(path)
+        ok = verify(log)
+        failed += not ok
+        total_ticks += log.ticks
+        print(f"{path}: scor {log.score}, {log.ticks} tick-uri, {'OK' if ok else 'NU SE POTRIVEȘTE'}")
+    elapsed = time.perf_counter() - start
+    if total_ticks:
+        print(f"{total_ticks} tick-uri rejucate în {elapsed:.2f} s ({total_ticks / elapsed:,.0f} tick-uri/s)")
+    sys.exit(1 if failed else 0)
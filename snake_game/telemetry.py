@@ -0,0 +1,121 @@
+import csv
+import json
+import time
+from collections import deque
+
+# Fazele unui cadru, în ordinea din bucla jocului; idle e timpul dormit în clock.tick()
+PHASES = ('events', 'simulation', 'draw', 'display', 'idle')
+
+# Histograma duratei cadrelor: găleți de 0,5 ms până la 100 ms, restul în ultima
+BUCKET_MS = 0.5
+BUCKETS = 200
+
+# Overlay-ul se recalculează de două ori pe secundă, din ultimele cadre
+OVERLAY_INTERVAL = 0.5
+OVERLAY_FRAMES = 144
+
+
+class FrameStats:
+    """Timpii fiecărui cadru, pe faze, pentru bucla din main.py
+
+    Bucla apelează begin_frame() la începutul cadrului și mark(faza) după
+    fiecare fază; timpul de la ultimul mark până la următorul begin_frame()
+    este idle. Se păstrează ultimele `history` cadre (pentru export și
+    overlay) și, pentru toată sesiunea, histograma duratei cadrelor și
+    numărul de cadre pierdute: un cadru care durează cât k perioade de
+    target_fps înseamnă k - 1 cadre pierdute.
+
+    Nimic din modul nu rulează dacă bucla primește telemetry=None.
+    """
+
+    def __init__(self, target_fps, history=100000):
+        self.budget_ns = 1e9 / target_fps
+        self.target_fps = target_fps
+        self.frames = deque(maxlen=history)  # (durată, faze..., tick-uri) în ns
+        self.histogram = [0] * BUCKETS
+        self.count = 0
+        self.dropped = 0
+        self.totals = dict.fromkeys(PHASES, 0)
+        self._start = None
+        self._last = None
+        self._phases = dict.fromkeys(PHASES, 0)
+        self._ticks = 0
+        self._overlay_at = 0.0
+        self._overlay = ()
+
+    def begin_frame(self):
+        now = time.perf_counter_ns()
+        if self._start is not None:
+            self._phases['idle'] = now - self._last
+            self._end_frame(now - self._start)
+        self._start = self._last = now
+        self._ticks = 0
+
+    def mark(self, phase, ticks=0):
+        """Timpul de la mark-ul anterior (sau de la începutul cadrului) intră la `phase`"""
+        now = time.perf_counter_ns()
+        self._phases[phase] = now - self._last
+        self._last = now
+        self._ticks += ticks
+
+    def _end_frame(self, duration):
+        phases = self._phases
+        self.frames.append((duration,) + tuple(phases[phase] for phase in PHASES) + (self._ticks,))
+        for phase in PHASES:
+            self.totals[phase] += phases[phase]
+            phases[phase] = 0
+        self.histogram[min(int(duration / 1e6 / BUCKET_MS), BUCKETS - 1)] += 1
+        self.count += 1
+        missed = round(duration / self.budget_ns) - 1
+        if missed > 0:
+            self.dropped += missed
+
+    def percentile(self, fraction):
+        """Durata cadrului (ms) sub care sunt `fraction` din cadre, din histogramă"""
+        wanted = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.histogram):
+            seen += count
+            if count and seen >= wanted:
+                return (bucket + 1) * BUCKET_MS
+        return 0.0
+
+    def overlay_lines(self):
+        """Rezumatul ultimelor cadre pentru overlay, refăcut la OVERLAY_INTERVAL secunde"""
+        now = time.perf_counter()
+        if now - self._overlay_at >= OVERLAY_INTERVAL and self.frames:
+            self._overlay_at = now
+            recent = [self.frames[-i] for i in range(1, min(OVERLAY_FRAMES, len(self.frames)) + 1)]
+            frame_ms = sorted(frame[0] / 1e6 for frame in recent)
+            means = [sum(frame[i + 1] for frame in recent) / len(recent) / 1e6 for i in range(len(PHASES) - 1)]
+            fps = 1000 / (sum(frame_ms) / len(frame_ms))
+            self._overlay = (
+                f"{fps:.0f} FPS  cadru p50 {frame_ms[len(frame_ms) // 2]:.2f} ms  max {frame_ms[-1]:.2f} ms  "
+                f"pierdute {self.dropped}",
+                "  ".join(f"{phase} {mean:.2f}" for phase, mean in zip(PHASES, means)) + " ms",
+            )
+        return self._overlay
+
+    def summary(self):
+        return {
+            'frames': self.count,
+            'target_fps': self.target_fps,
+            'dropped_frames': self.dropped,
+            'frame_ms': {name: self.percentile(fraction)
+                         for name, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99), ('max', 1.0))},
+            'phase_mean_ms': {phase: self.totals[phase] / max(self.count, 1) / 1e6 for phase in PHASES},
+            'histogram_ms': [[bucket * BUCKET_MS, count] for bucket, count in enumerate(self.histogram) if count],
+        }
+
+    def export(self, path):
+        """Scrie cadrele păstrate ca CSV (un rând pe cadru) sau rezumatul și cadrele ca JSON, după extensie"""
+        columns = ('frame_ms',) + tuple(f'{phase}_ms' for phase in PHASES) + ('ticks',)
+        rows = [[round(value / 1e6, 4) for value in frame[:-1]] + [frame[-1]] for frame in self.frames]
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump(dict(self.summary(), columns=columns, samples=rows), f)
+        else:
+            with open(path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(columns)
+                writer.writerows(rows)
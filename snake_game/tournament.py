@@ -0,0 +1,130 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from agents import AGENTS, make_agent
+from engine import SnakeEngine
+from replay import Recorder
+
+# Histograma latențelor: găleți de 100 ns până la 10 ms, restul în ultima
+BUCKET_NS = 100
+BUCKETS = 100000
+
+
+def play_shard(args):
+    """Joacă jocurile cu seed-urile date pentru un agent, într-un proces
+
+    Returnează scorurile, pașii, câte jocuri s-au terminat cu tabla plină,
+    prin ciocnire sau prin limita de pași, timpul petrecut și histograma
+    latenței lui act() (câte mutări au durat între k și k + 1 găleți).
+    """
+    name, seeds, width, height, max_steps, replay_dir = args
+    agent = make_agent(name, width, height)
+    histogram = [0] * BUCKETS
+    scores = []
+    steps = wins = deaths = timeouts = 0
+    clock = time.perf_counter_ns
+    start = time.perf_counter()
+    for seed in seeds:
+        engine = SnakeEngine(width, height, seed)
+        recorder = Recorder(width, height, seed) if replay_dir else None
+        agent.reset(engine)
+        while not engine.done and engine.steps < max_steps:
+            before = clock()
+            action = agent.act(engine)
+            histogram[min((clock() - before) // BUCKET_NS, BUCKETS - 1)] += 1
+            if recorder:
+                recorder.record(action)
+            engine.step(action)
+        scores.append(engine.score)
+        steps += engine.steps
+        if not engine.done:
+            timeouts += 1
+        elif engine.apple_cell < 0:
+            wins += 1
+        else:
+            deaths += 1
+            # Jocurile pierdute se păstrează pentru a fi rejucate (python main.py <fișier>)
+            if recorder:
+                recorder.save(os.path.join(replay_dir, f"{name}-{seed}.snkr"), engine.score)
+    return name, scores, steps, wins, deaths, timeouts, time.perf_counter() - start, histogram
+
+
+def percentile(histogram, fraction):
+    """Latența (în µs) sub care sunt `fraction` din mutări"""
+    total = sum(histogram)
+    if not total:
+        return 0.0
+    wanted = fraction * total
+    seen = 0
+    for bucket, count in enumerate(histogram):
+        seen += count
+        if seen >= wanted:
+            return (bucket + 1) * BUCKET_NS / 1000
+    return BUCKETS * BUCKET_NS / 1000
+
+
+def run_tournament(names, games, width=30, height=20, max_steps=100000, workers=None, seed=0,
+                   replay_dir=None, chunk=25):
+    """Joacă `games` jocuri pentru fiecare agent, împărțite pe un pool de procese
+
+    Toți agenții primesc aceleași seed-uri (seed .. seed + games - 1), deci
+    aceleași mere la aceleași acțiuni. Returnează {agent: rezultate} și
+    durata totală.
+    """
+    workers = workers or os.cpu_count() or 1
+    if replay_dir:
+        os.makedirs(replay_dir, exist_ok=True)
+    seeds = list(range(seed, seed + games))
+    tasks = [(name, seeds[i:i + chunk], width, height, max_steps, replay_dir)
+             for name in names for i in range(0, games, chunk)]
+
+    results = {name: {'scores': [], 'steps': 0, 'wins': 0, 'deaths': 0, 'timeouts': 0,
+                      'seconds': 0.0, 'histogram': [0] * BUCKETS} for name in names}
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for name, scores, steps, wins, deaths, timeouts, seconds, histogram in pool.map(play_shard, tasks):
+            result = results[name]
+            result['scores'].extend(scores)
+            result['steps'] += steps
+            result['wins'] += wins
+            result['deaths'] += deaths
+            result['timeouts'] += timeouts
+            result['seconds'] += seconds
+            result['histogram'] = [a + b for a, b in zip(result['histogram'], histogram)]
+    return results, time.perf_counter() - start
+
+
+def print_report(results, elapsed, workers):
+    print(f"{'agent':<10} {'jocuri':>6} {'scor mediu':>10} {'min':>5} {'max':>5} {'câștig':>7} {'morți':>6} "
+          f"{'limită':>7} {'pași/s':>10} {'p50 µs':>8} {'p90 µs':>8} {'p99 µs':>8} {'max µs':>8}")
+    for name, result in results.items():
+        scores = result['scores']
+        histogram = result['histogram']
+        slowest = max((bucket for bucket, count in enumerate(histogram) if count), default=-1) + 1
+        # pași/s pe un proces: pașii agentului împărțiți la timpul petrecut în jocurile lui
+        speed = result['steps'] / result['seconds'] if result['seconds'] else 0.0
+        print(f"{name:<10} {len(scores):>6} {sum(scores) / len(scores):>10.1f} {min(scores):>5} {max(scores):>5} "
+              f"{result['wins']:>7} {result['deaths']:>6} {result['timeouts']:>7} {speed:>10,.0f} "
+              f"{percentile(histogram, 0.5):>8.1f} {percentile(histogram, 0.9):>8.1f} "
+              f"{percentile(histogram, 0.99):>8.1f} {slowest * BUCKET_NS / 1000:>8.1f}")
+    total = sum(result['steps'] for result in results.values())
+    print(f"{total:,} pași în {elapsed:.1f} s pe {workers} procese ({total / elapsed:,.0f} pași/s în total)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Turneu de agenți Snake pe jocuri cu seed")
+    parser.add_argument('agents', nargs='*', default=sorted(AGENTS), help=f"agenți ({', '.join(sorted(AGENTS))})")
+    parser.add_argument('--games', type=int, default=1000)
+    parser.add_argument('--width', type=int, default=30)
+    parser.add_argument('--height', type=int, default=20)
+    parser.add_argument('--max-steps', type=int, default=100000, help="un joc se oprește după atâția pași")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--replays', metavar='DIR', help="salvează aici jocurile pierdute, ca fișiere .snkr")
+    args = parser.parse_args()
+
+    results, elapsed = run_tournament(args.agents, args.games, args.width, args.height, args.max_steps,
+                                      args.workers, args.seed, args.replays)
+    print_report(results, elapsed, args.workers)